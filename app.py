@@ -15,16 +15,18 @@ Web Interface:
     GET /status - Application status and health
 """
 
-from flask import Flask, request, jsonify, make_response, render_template, Blueprint, session, flash, redirect
+from flask import Flask, Response, request, jsonify, make_response, render_template, Blueprint, session, flash, redirect
 import pandas as pd
+import shutil
 import tempfile
 import os
-import json
+import io
+import math
+import orjson
 import numpy as np
 import sqlite3
-import pickle
 import uuid
-from datetime import datetime, date
+from datetime import datetime
 from pathlib import Path
 from utils.csv_format_detector_fallback import CSVFormatDetectorFallback
 from utils.csv_format_module import CSVFormatDetector
@@ -33,10 +35,9 @@ from utils.ai_file_analyzer import AIFileAnalyzer
 from dotenv import load_dotenv
 import logging
 from werkzeug.utils import secure_filename
-from core.price_fetcher import PriceFetcher
+from core.price_fetcher import PriceFetcher, PriceDatabase, DATETIME_FORMAT
 from core.production_loader import ProductionLoader
 from core.price_analyzer import PriceAnalyzer
-from core.db_manager import PriceDatabaseManager
 
 # Load environment variables
 load_dotenv()
@@ -48,40 +49,52 @@ logger = logging.getLogger(__name__)
 # Security Configuration - Hardcode database path for production security
 SECURE_DB_PATH = 'data/price_data.db'  # No user input allowed for database path
 
-class NumpyJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that handles NumPy and Pandas data types."""
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        elif isinstance(obj, np.floating):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, pd.Timestamp):
-            return obj.isoformat()
-        elif isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        return super().default(obj)
+# orjson handles NumPy arrays and datetimes natively; the default hook covers the rest
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def round_floats(values, ndigits):
+    """
+    Round each value with the built-in round(), returning a list of Python floats.
+    
+    np.round and pandas .round scale by 10**ndigits before rounding, so values near
+    a tie can land one unit away from round(); API output keeps round()'s results.
+    """
+    return [round(value, ndigits) for value in np.asarray(values, dtype=np.float64).tolist()]
+
+def orjson_default(obj):
+    """Serialize Pandas/NumPy types that orjson does not handle natively."""
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-key-change-in-production-MUST-BE-RANDOM')
 
 # Internal API security configuration
+import atexit
 import secrets
 import hashlib
+import gzip
 import time
-from collections import defaultdict
+import threading
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import wraps
 from flask import session
 
 # Generate a secure internal API token per session
 INTERNAL_API_HEADER = 'X-Internal-API-Token'
 
-# Rate limiting
-request_counts = defaultdict(lambda: defaultdict(int))
+# Rate limiting: ip -> (window_index, request_count)
+request_counts = {}
 REQUEST_LIMIT = 100  # requests per minute per IP
 REQUEST_WINDOW = 60  # seconds
+REQUEST_COUNTS_MAX_IPS = 10000  # sweep stale entries beyond this many tracked IPs
 
 def generate_internal_token():
     """Generate a secure token for internal API access."""
@@ -89,20 +102,23 @@ def generate_internal_token():
 
 def check_rate_limit(ip):
     """Check if IP is within rate limits."""
-    current_time = int(time.time())
-    minute_window = current_time // REQUEST_WINDOW
+    window = int(time.time()) // REQUEST_WINDOW
+    entry = request_counts.get(ip)
     
-    # Clean old entries
-    for old_minute in list(request_counts[ip].keys()):
-        if old_minute < minute_window - 1:
-            del request_counts[ip][old_minute]
+    # First request in this window
+    if entry is None or entry[0] != window:
+        if entry is None and len(request_counts) >= REQUEST_COUNTS_MAX_IPS:
+            # Drop IPs that have not been seen in the current window
+            for stale_ip in [k for k, v in request_counts.items() if v[0] != window]:
+                del request_counts[stale_ip]
+        request_counts[ip] = (window, 1)
+        return True
     
     # Check current requests
-    current_requests = request_counts[ip][minute_window]
-    if current_requests >= REQUEST_LIMIT:
+    if entry[1] >= REQUEST_LIMIT:
         return False
     
-    request_counts[ip][minute_window] += 1
+    request_counts[ip] = (window, entry[1] + 1)
     return True
 
 def require_internal_access(f):
@@ -150,19 +166,24 @@ load_dotenv()
 def safe_jsonify(data, status_code=200):
     """Custom jsonify function that handles NumPy/Pandas data types."""
     try:
-        json_str = json.dumps(data, cls=NumpyJSONEncoder, ensure_ascii=False)
-        response = make_response(json_str, status_code)
+        json_bytes = orjson.dumps(data, default=orjson_default, option=ORJSON_OPTIONS)
+        response = make_response(json_bytes, status_code)
         response.headers['Content-Type'] = 'application/json'
         return response
     except TypeError as e:
         logger.error(f"JSON serialization error: {e}")
-        error_response = make_response(json.dumps({'error': 'Data serialization error'}), 500)
+        error_response = make_response(orjson.dumps({'error': 'Data serialization error'}), 500)
         error_response.headers['Content-Type'] = 'application/json'
         return error_response
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Uploads spilled to disk are copied in chunks of this size
+UPLOAD_COPY_CHUNK_SIZE = 1024 * 1024
 
 def cleanup_old_cache_files():
-    """Clean up cache files older than 24 hours."""
+    """
+    Clean up cache files older than 24 hours, and register the remaining results
+    cache files in the manifest so uploads evict them on schedule.
+    """
     try:
         cache_dir = Path('data/cache')
         if not cache_dir.exists():
@@ -170,16 +191,86 @@ def cleanup_old_cache_files():
             
         cutoff_time = datetime.now().timestamp() - (24 * 60 * 60)  # 24 hours ago
         
-        for cache_file in cache_dir.glob('*.pkl'):
-            if cache_file.stat().st_mtime < cutoff_time:
-                try:
-                    cache_file.unlink()
-                    logger.info(f"Cleaned up old cache file: {cache_file.name}")
-                except Exception as e:
-                    logger.warning(f"Failed to clean up cache file {cache_file.name}: {e}")
+        # scandir entries carry stat info from the directory read, avoiding a stat() per file
+        with os.scandir(cache_dir) as entries:
+            cache_files = [(entry, entry.stat()) for entry in entries if entry.name.endswith(('.json', '.pkl'))]
+        
+        removed = []
+        surviving = []
+        for entry, stat in cache_files:
+            session_id = entry.name[:-len('.json')] if entry.name.endswith('.json') else None
+            if stat.st_mtime >= cutoff_time:
+                if session_id is not None:
+                    surviving.append((session_id, int(stat.st_mtime), stat.st_size))
+                continue
+            try:
+                os.unlink(entry.path)
+                if session_id is not None:
+                    removed.append((session_id,))
+                logger.info(f"Cleaned up old cache file: {entry.name}")
+            except Exception as e:
+                logger.warning(f"Failed to clean up cache file {entry.name}: {e}")
+        
+        # Files written by a previous run may be missing from the manifest; keep
+        # rows already recorded and date the others by their modification time
+        with _manifest_lock, _manifest_connection() as conn:
+            conn.executemany('INSERT OR IGNORE INTO cache_meta (session_id, created_at, bytes) VALUES (?, ?, ?)',
+                             surviving)
+            conn.executemany('DELETE FROM cache_meta WHERE session_id = ?', removed)
     except Exception as e:
         logger.warning(f"Cache cleanup failed: {e}")
 
+# Results cache files are tracked in a small SQLite manifest, so eviction on
+# upload is an indexed query instead of a scan of the cache directory
+RESULTS_CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+RESULTS_CACHE_MAX_FILES = 500
+CACHE_MANIFEST_PATH = 'data/cache/manifest.db'
+
+_manifest_conn = None
+_manifest_lock = threading.Lock()
+
+def _manifest_connection():
+    """Return the process-wide manifest connection, creating it and its table on first use."""
+    global _manifest_conn
+    if _manifest_conn is None:
+        conn = sqlite3.connect(CACHE_MANIFEST_PATH, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_meta (
+                session_id TEXT PRIMARY KEY,
+                created_at INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_meta_created ON cache_meta(created_at)')
+        _manifest_conn = conn
+    return _manifest_conn
+
+def record_cache_file(session_id, size):
+    """Register a written results cache file and evict expired or excess ones."""
+    now = int(time.time())
+    # One connection per process, used by one upload at a time
+    with _manifest_lock, _manifest_connection() as conn:
+        conn.execute('INSERT OR REPLACE INTO cache_meta (session_id, created_at, bytes) VALUES (?, ?, ?)',
+                     (session_id, now, size))
+        
+        stale = conn.execute('''
+            SELECT session_id FROM cache_meta WHERE created_at < ?
+            UNION
+            SELECT session_id FROM (SELECT session_id FROM cache_meta ORDER BY created_at DESC LIMIT -1 OFFSET ?)
+        ''', (now - RESULTS_CACHE_MAX_AGE, RESULTS_CACHE_MAX_FILES)).fetchall()
+        
+        for stale_session_id, in stale:
+            try:
+                os.unlink(Path('data/cache') / f"{stale_session_id}.json")
+                logger.info(f"Cleaned up old cache file: {stale_session_id}.json")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to clean up cache file {stale_session_id}.json: {e}")
+        conn.executemany('DELETE FROM cache_meta WHERE session_id = ?', stale)
+
 # Currency conversion rates (base: EUR)
 CURRENCY_RATES = {
     'EUR': 1.0,
@@ -190,11 +281,23 @@ CURRENCY_RATES = {
     'GBP': 0.85
 }
 
+# Direct SEK -> target currency rates (analysis amounts are computed in SEK)
+SEK_RATES = {currency: rate / CURRENCY_RATES['SEK'] for currency, rate in CURRENCY_RATES.items()}
+
+# Column types for price_data reads, so pandas skips dtype inference
+PRICE_SQL_DTYPES = {'price': 'float64'}
+# Parse the datetime column with its known storage format instead of inferring it
+PRICE_SQL_PARSE_DATES = {'datetime': {'format': DATETIME_FORMAT}}
+
+# Rows per chunk when streaming CSV exports
+CSV_EXPORT_CHUNK_ROWS = 10000
+
 ALLOWED_EXTENSIONS = {'csv', 'txt', 'xls', 'xlsx'}
+_ALLOWED_SUFFIXES = tuple(f'.{ext}' for ext in ALLOWED_EXTENSIONS)
 
 def allowed_file(filename):
     """Check if file extension is allowed."""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
 
 def get_currency_rate(currency):
     """Get exchange rate for currency."""
@@ -203,6 +306,306 @@ def get_currency_rate(currency):
         raise ValueError(f"Unsupported currency: {currency}. Supported: {', '.join(CURRENCY_RATES.keys())}")
     return CURRENCY_RATES[currency]
 
+# Open ends of a price_data date range; ISO datetime strings sort between them
+PRICE_RANGE_MIN = '0000-01-01'
+PRICE_RANGE_MAX = '9999-12-31'
+
+def price_range_filter(area, start_date=None, end_date=None):
+    """
+    Build the WHERE clause and parameters for an area/date-range price_data query.
+    
+    The clause text is the same for every range, so each query built on it
+    is prepared once per connection and reused from the statement cache.
+    """
+    return ('area_code = ? AND datetime BETWEEN ? AND ?',
+            [area, start_date or PRICE_RANGE_MIN, end_date or PRICE_RANGE_MAX])
+
+def with_uploaded_csv(f):
+    """
+    Validate an analysis upload form and pass its parts to the endpoint.
+    
+    The endpoint is called as f(file, file_buffer, area, currency, currency_rate,
+    start_date, end_date), with the upload read into an in-memory buffer.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file provided'}), 400
+        
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+        
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'Invalid file type. Only CSV files allowed'}), 400
+        
+        # Get parameters
+        area = request.form.get('area')
+        if not area:
+            return jsonify({'error': 'Area code is required'}), 400
+        
+        currency = request.form.get('currency', 'SEK').upper()
+        start_date = request.form.get('start_date')
+        end_date = request.form.get('end_date')
+        # SECURITY: Database path hardcoded for security
+        # db_path parameter removed from public API
+        
+        # Validate currency
+        try:
+            currency_rate = get_currency_rate(currency)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Read the upload into memory instead of a temporary file
+        file_buffer = io.BytesIO(file.read())
+        
+        return f(file, file_buffer, area, currency, currency_rate, start_date, end_date, *args, **kwargs)
+    return decorated_function
+
+# Shared analysis components, reused across requests
+_PRODUCTION_LOADER = ProductionLoader()
+_ANALYZER = PriceAnalyzer()
+_price_fetcher = None
+_price_fetcher_lock = threading.Lock()
+
+def get_price_fetcher():
+    """Get the shared PriceFetcher, creating it on first use."""
+    global _price_fetcher
+    if _price_fetcher is None:
+        with _price_fetcher_lock:
+            if _price_fetcher is None:
+                _price_fetcher = PriceFetcher(db_path=SECURE_DB_PATH)
+    return _price_fetcher
+
+# Apply current schema, indexes and journal mode to an existing database at startup
+if Path(SECURE_DB_PATH).exists():
+    try:
+        PriceDatabase(SECURE_DB_PATH).close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not update price database schema: {e}")
+
+# Sweep cache files left from before the manifest, or by a previous run; uploads
+# only evict files recorded in the manifest
+cleanup_old_cache_files()
+
+# Pool of read-only connections for the database read endpoints
+READ_POOL_SIZE = 8
+_read_pool = queue.SimpleQueue()
+
+def _open_read_connection():
+    """Open a tuned read-only connection to the price database."""
+    # Keep SQL text identical for repeated query shapes so they hit the statement cache
+    conn = sqlite3.connect(f'file:{SECURE_DB_PATH}?mode=ro', uri=True,
+                           check_same_thread=False, cached_statements=256)
+    conn.execute('PRAGMA query_only=1')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')  # 64 MiB page cache
+    conn.execute('PRAGMA mmap_size=268435456')  # 256MB memory map
+    return conn
+
+@contextmanager
+def read_connection():
+    """Yield a pooled read-only database connection, so concurrent reads don't queue."""
+    try:
+        conn = _read_pool.get_nowait()
+    except queue.Empty:
+        conn = _open_read_connection()
+    try:
+        yield conn
+    finally:
+        if _read_pool.qsize() < READ_POOL_SIZE:
+            _read_pool.put(conn)
+        else:
+            conn.close()
+
+def close_database_connections():
+    """Close the process's long-lived database connections at shutdown."""
+    global _manifest_conn
+    while True:
+        try:
+            _read_pool.get_nowait().close()
+        except queue.Empty:
+            break
+    if _price_fetcher is not None:
+        _price_fetcher.db.close()
+    with _manifest_lock:
+        if _manifest_conn is not None:
+            _manifest_conn.close()
+            _manifest_conn = None
+
+atexit.register(close_database_connections)
+
+# LLM-detected CSV formats keyed by a fingerprint of the file head
+LLM_FORMAT_CACHE_SIZE = 128
+LLM_FORMAT_FINGERPRINT_BYTES = 4096
+_llm_format_cache = OrderedDict()
+_llm_format_cache_lock = threading.Lock()
+
+# Bytes of an upload's head parsed for the format detection preview
+CSV_SAMPLE_BYTES = 16 * 1024
+
+def read_csv_sample(file_buffer, params, rows=5):
+    """Parse the first rows of an uploaded CSV from its head, falling back to the whole file."""
+    data = file_buffer.getbuffer()
+    if len(data) > CSV_SAMPLE_BYTES:
+        head = bytes(data[:CSV_SAMPLE_BYTES])
+        # Whole lines only, so the last sampled row is never cut short
+        head = head[:head.rfind(b'\n') + 1]
+        try:
+            sample = pd.read_csv(io.BytesIO(head), nrows=rows, **params)
+            if len(sample) == rows:
+                return sample
+        except (ValueError, UnicodeDecodeError):
+            pass
+    file_buffer.seek(0)
+    return pd.read_csv(file_buffer, nrows=rows, **params)
+
+def detect_format_with_llm(file_buffer):
+    """Detect CSV format with the LLM, reusing the result for files with an identical head."""
+    fingerprint = hashlib.sha256(file_buffer.getvalue()[:LLM_FORMAT_FINGERPRINT_BYTES]).hexdigest()
+    with _llm_format_cache_lock:
+        params = _llm_format_cache.get(fingerprint)
+        if params is not None:
+            _llm_format_cache.move_to_end(fingerprint)
+    if params is not None:
+        logger.info("Using cached LLM CSV format detection")
+        return dict(params)
+    
+    params = CSVFormatDetector().detect_format(file_buffer)
+    with _llm_format_cache_lock:
+        _llm_format_cache[fingerprint] = params
+        if len(_llm_format_cache) > LLM_FORMAT_CACHE_SIZE:
+            _llm_format_cache.popitem(last=False)
+    return dict(params)
+
+# /analyze results keyed by (file hash, area, currency, start, end), stamped with
+# the price database state they were computed from
+ANALYSIS_CACHE_SIZE = 64
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+# Runs price lookups alongside CSV parsing when the request fixes the period
+_price_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='price-fetch')
+
+def analyze_upload(file_buffer, area, currency, currency_rate, start_date=None, end_date=None):
+    """
+    Run the price/production analysis for an uploaded file.
+    
+    Returns (analysis, period_start, period_end, record_count). Results are
+    memoized per file content and parameters so repeated requests skip the
+    price fetch, merge and aggregation. Entries are dropped once the price
+    database changes, so results computed while prices were missing are
+    redone after they have been fetched.
+    """
+    cache_key = (hashlib.sha256(file_buffer.getvalue()).hexdigest(), area, currency, start_date, end_date)
+    stamp = _price_db_stamp()
+    with _analysis_cache_lock:
+        entry = _analysis_cache.get(cache_key)
+        if entry is not None and entry[0] == stamp:
+            _analysis_cache.move_to_end(cache_key)
+            return entry[1]
+    
+    # With both dates given the price lookup doesn't depend on the upload,
+    # so start it before parsing the CSV
+    prices_future = None
+    if start_date and end_date:
+        start = pd.Timestamp(start_date, tz='Europe/Stockholm')
+        end = pd.Timestamp(end_date, tz='Europe/Stockholm')
+        prices_future = _price_executor.submit(get_price_fetcher().get_price_data, area, start, end)
+    
+    # Load production data
+    production_df = _PRODUCTION_LOADER.load_production_data(file_buffer)
+    
+    # Determine date range
+    production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
+    production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
+    start = pd.Timestamp(start_date, tz='Europe/Stockholm') if start_date else production_start
+    end = pd.Timestamp(end_date, tz='Europe/Stockholm') if end_date else production_end
+    
+    # Clip production data to the period with a label slice on the sorted index
+    if not production_df.index.is_monotonic_increasing:
+        production_df = production_df.sort_index()
+    production_df = production_df.loc[start.tz_localize(None):end.tz_localize(None)]
+    
+    # Get price data, merge and analyze
+    if prices_future is not None:
+        prices_df = prices_future.result()
+    else:
+        prices_df = get_price_fetcher().get_price_data(area, start, end)
+    merged_df = _ANALYZER.merge_data(prices_df, production_df, currency_rate)
+    analysis = _ANALYZER.analyze_data(merged_df)
+    
+    result = (analysis, merged_df.index.min().isoformat(), merged_df.index.max().isoformat(), len(merged_df))
+    with _analysis_cache_lock:
+        _analysis_cache[cache_key] = (stamp, result)
+        if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return result
+
+# Serialized /graph/* responses keyed by endpoint and query arguments
+GRAPH_CACHE_SIZE = 256
+GRAPH_GZIP_MIN_BYTES = 1024  # smaller bodies are sent uncompressed
+GRAPH_BATCH_MAX_AREAS = 16  # upper bound on areas per /graph/batch request
+_graph_cache = OrderedDict()
+_graph_cache_lock = threading.Lock()
+
+def _price_db_stamp():
+    """Modification stamp of the price database, including its WAL file."""
+    stamp = []
+    for suffix in ('', '-wal'):
+        try:
+            stamp.append(os.stat(SECURE_DB_PATH + suffix).st_mtime_ns)
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
+
+def cached_graph_response(f):
+    """
+    Serve a read-only price endpoint's (graph or database summary) successful
+    responses from memory.
+    
+    Entries are dropped once the price database changes. Responses carry an
+    ETag, and a matching If-None-Match is answered with 304. Larger bodies are
+    gzip-compressed once when cached and sent compressed to clients that
+    accept it.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        cache_key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        stamp = _price_db_stamp()
+        with _graph_cache_lock:
+            entry = _graph_cache.get(cache_key)
+            if entry is not None and entry[0] == stamp:
+                _graph_cache.move_to_end(cache_key)
+            else:
+                entry = None
+        
+        if entry is None:
+            response = f(*args, **kwargs)
+            # Errors are returned as (response, status) and never cached
+            if not isinstance(response, Response) or response.status_code != 200:
+                return response
+            body = response.get_data()
+            gzip_body = gzip.compress(body) if len(body) >= GRAPH_GZIP_MIN_BYTES else None
+            entry = (stamp, hashlib.sha1(body).hexdigest(), body, gzip_body)
+            with _graph_cache_lock:
+                _graph_cache[cache_key] = entry
+                if len(_graph_cache) > GRAPH_CACHE_SIZE:
+                    _graph_cache.popitem(last=False)
+        
+        _, etag, body, gzip_body = entry
+        if gzip_body is not None and request.accept_encodings['gzip']:
+            response = Response(gzip_body, content_type='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            # Each encoding is its own representation with its own ETag
+            etag += '-gzip'
+        else:
+            response = Response(body, content_type='application/json')
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    return decorated_function
+
 def format_price_with_currency(price_eur_per_mwh, currency, rate):
     """Format price in the requested currency and appropriate units."""
     if currency == 'EUR':
@@ -212,69 +615,75 @@ def format_price_with_currency(price_eur_per_mwh, currency, rate):
         price_local_kwh = (price_eur_per_mwh * rate) / 1000
         return f"{price_local_kwh:.4f} {currency}/kWh"
 
+# Static payloads, serialized once at import
+_HEALTH_JSON = orjson.dumps({
+    'status': 'healthy',
+    'service': 'Sourceful Energy Web Application',
+    'version': '1.0.0'
+})
+_CURRENCIES_JSON = orjson.dumps({
+    'supported_currencies': list(CURRENCY_RATES.keys()),
+    'default': 'SEK',
+    'rates': CURRENCY_RATES
+})
+
 @internal_api.route('/health', methods=['GET'])
 @require_internal_access
 def health_check():
     """Internal health check endpoint."""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'Sourceful Energy Web Application',
-        'version': '1.0.0'
-    })
+    return Response(_HEALTH_JSON, content_type='application/json')
 
-@require_internal_access
 @internal_api.route('/currencies', methods=['GET'])
 @require_internal_access
 def get_supported_currencies():
     """Get list of supported currencies."""
-    return jsonify({
-        'supported_currencies': list(CURRENCY_RATES.keys()),
-        'default': 'SEK',
-        'rates': CURRENCY_RATES
-    })
+    response = Response(_CURRENCIES_JSON, content_type='application/json')
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response
 
-@require_internal_access
 @internal_api.route('/database/info', methods=['GET'])
+@require_internal_access
+@cached_graph_response
 def database_info():
     """Get database information."""
     try:
-        manager = PriceDatabaseManager(SECURE_DB_PATH)
-        
         if not Path(SECURE_DB_PATH).exists():
             return jsonify({'error': 'Database does not exist'}), 404
         
-        # Get basic database info
-        import sqlite3
-        with sqlite3.connect(SECURE_DB_PATH) as conn:
-            total_records = conn.execute('SELECT COUNT(*) FROM price_data').fetchone()[0]
-            areas = conn.execute('SELECT DISTINCT area_code FROM price_data ORDER BY area_code').fetchall()
-            date_range = conn.execute('SELECT MIN(datetime), MAX(datetime) FROM price_data').fetchone()
-            
-            # Per-area statistics
-            area_stats = []
-            for (area,) in areas:
-                area_info = conn.execute('''
-                    SELECT COUNT(*), MIN(datetime), MAX(datetime), 
-                           MIN(price_eur_per_mwh), MAX(price_eur_per_mwh), AVG(price_eur_per_mwh)
-                    FROM price_data 
-                    WHERE area_code = ?
-                ''', (area,)).fetchone()
-                
-                area_stats.append({
-                    'area_code': area,
-                    'records': area_info[0],
-                    'date_range': {
-                        'start': area_info[1],
-                        'end': area_info[2]
-                    },
-                    'price_range_eur_mwh': {
-                        'min': area_info[3],
-                        'max': area_info[4],
-                        'avg': area_info[5]
-                    }
-                })
+        # Per-area statistics in a single aggregate pass
+        with read_connection() as conn:
+            rows = conn.execute('''
+                SELECT area_code, COUNT(*), MIN(datetime), MAX(datetime),
+                       MIN(price_eur_per_mwh), MAX(price_eur_per_mwh), AVG(price_eur_per_mwh)
+                FROM price_data
+                GROUP BY area_code
+                ORDER BY area_code
+            ''').fetchall()
+        
+        area_stats = [
+            {
+                'area_code': area,
+                'records': records,
+                'date_range': {
+                    'start': start,
+                    'end': end
+                },
+                'price_range_eur_mwh': {
+                    'min': price_min,
+                    'max': price_max,
+                    'avg': price_avg
+                }
+            }
+            for area, records, start, end, price_min, price_max, price_avg in rows
+        ]
+        
+        # Overall totals derived from the per-area results
+        areas = [row[0] for row in rows]
+        total_records = sum(row[1] for row in rows)
+        date_range = (min(row[2] for row in rows), max(row[3] for row in rows)) if rows else (None, None)
         
-        return jsonify({
+        return safe_jsonify({
             'total_records': total_records,
             'areas_count': len(areas),
             'date_range': {
@@ -288,19 +697,19 @@ def database_info():
         logger.error(f"Database info error: {e}")
         return jsonify({'error': str(e)}), 500
 
-@require_internal_access
 @internal_api.route('/database/areas', methods=['GET'])
+@require_internal_access
+@cached_graph_response
 def list_areas():
     """List available areas in the database."""
     try:
         if not Path(SECURE_DB_PATH).exists():
-            return jsonify({'areas': []})
+            return safe_jsonify({'areas': []})
         
-        import sqlite3
-        with sqlite3.connect(SECURE_DB_PATH) as conn:
+        with read_connection() as conn:
             areas = conn.execute('SELECT DISTINCT area_code FROM price_data ORDER BY area_code').fetchall()
         
-        return jsonify({
+        return safe_jsonify({
             'areas': [area[0] for area in areas]
         })
         
@@ -308,8 +717,8 @@ def list_areas():
         logger.error(f"List areas error: {e}")
         return jsonify({'error': str(e)}), 500
 
-@require_internal_access
 @internal_api.route('/detect-csv-format', methods=['POST'])
+@require_internal_access
 def detect_csv_format():
     """Detect CSV format for uploaded file."""
     if 'file' not in request.files:
@@ -323,10 +732,8 @@ def detect_csv_format():
     if not file.filename.lower().endswith('.csv'):
         return jsonify({'error': 'Invalid file type. Only CSV files allowed'}), 400
     
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False) as temp_file:
-        file.save(temp_file.name)
-        temp_filename = temp_file.name
+    # Read the upload into memory instead of a temporary file
+    file_buffer = io.BytesIO(file.read())
     
     try:
         # Try LLM-powered detection first
@@ -335,11 +742,10 @@ def detect_csv_format():
         if use_llm:
             try:
                 logger.info("Attempting LLM-powered CSV format detection")
-                llm_detector = CSVFormatDetector()
-                params = llm_detector.detect_format(temp_filename)
+                params = detect_format_with_llm(file_buffer)
                 
                 # Test load a few rows to validate
-                df_sample = pd.read_csv(temp_filename, nrows=5, **params)
+                df_sample = read_csv_sample(file_buffer, params)
                 
                 response = {
                     'status': 'success',
@@ -365,10 +771,10 @@ def detect_csv_format():
         # Fallback to traditional detection
         logger.info("Using traditional CSV format detection")
         detector = CSVFormatDetectorFallback()
-        params = detector.detect_format(temp_filename)
+        params = detector.detect_format(file_buffer)
         
         # Test load a few rows to validate
-        df_sample = pd.read_csv(temp_filename, nrows=5, **params)
+        df_sample = read_csv_sample(file_buffer, params)
         
         response = {
             'status': 'success',
@@ -391,17 +797,11 @@ def detect_csv_format():
     except Exception as e:
         logger.error(f"CSV format detection failed: {e}")
         return jsonify({'error': f'Format detection failed: {str(e)}'}), 500
-    
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(temp_filename)
-        except:
-            pass
 
-@require_internal_access
 @internal_api.route('/analyze/daily-summary', methods=['POST'])
-def analyze_daily_summary():
+@require_internal_access
+@with_uploaded_csv
+def analyze_daily_summary(file, file_buffer, area, currency, currency_rate, start_date, end_date):
     """
     Get daily summary analysis from production data.
     
@@ -413,132 +813,100 @@ def analyze_daily_summary():
     - end_date: End date YYYY-MM-DD (optional)
     """
     try:
-        # Validate request (reuse logic from main analyze endpoint)
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
+        # Factor for converting SEK amounts to the requested currency
+        currency_conversion_factor = SEK_RATES[currency]
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        # Reuse shared components and run analysis
+        price_fetcher = get_price_fetcher()
+        production_loader = _PRODUCTION_LOADER
+        analyzer = _ANALYZER
         
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Only CSV files allowed'}), 400
+        # Load production data
+        production_df = production_loader.load_production_data(file_buffer)
         
-        # Get parameters
-        area = request.form.get('area')
-        if not area:
-            return jsonify({'error': 'Area code is required'}), 400
+        # Determine date range
+        production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
+        production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
         
-        currency = request.form.get('currency', 'SEK').upper()
-        start_date = request.form.get('start_date')
-        end_date = request.form.get('end_date')
-        # SECURITY: Database path hardcoded for security
-        # db_path parameter removed from public API
+        if start_date:
+            start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
+        else:
+            start_date = production_start
+            
+        if end_date:
+            end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
+        else:
+            end_date = production_end
         
-        # Validate currency
-        try:
-            currency_rate = get_currency_rate(currency)
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 400
+        # Clip production data to the period with a label slice on the sorted index
+        if not production_df.index.is_monotonic_increasing:
+            production_df = production_df.sort_index()
+        production_df = production_df.loc[start_date.tz_localize(None):end_date.tz_localize(None)]
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False) as temp_file:
-            file.save(temp_file.name)
-            temp_filename = temp_file.name
+        # Get price data
+        prices_df = price_fetcher.get_price_data(area, start_date, end_date)
         
-        try:
-            # Create components and run analysis
-            price_fetcher = PriceFetcher(db_path=SECURE_DB_PATH)
-            production_loader = ProductionLoader()
-            analyzer = PriceAnalyzer()
-            
-            # Load production data
-            production_df = production_loader.load_production_data(temp_filename)
-            
-            # Determine date range
-            production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
-            production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
-            
-            if start_date:
-                start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
-                if start_date > production_start:
-                    production_df = production_df[production_df.index >= start_date.tz_localize(None)]
-            else:
-                start_date = production_start
-                
-            if end_date:
-                end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
-                if end_date < production_end:
-                    production_df = production_df[production_df.index <= end_date.tz_localize(None)]
-            else:
-                end_date = production_end
-            
-            # Get price data
-            prices_df = price_fetcher.get_price_data(area, start_date, end_date)
-            
-            # Merge and get daily summary
-            merged_df = analyzer.merge_data(prices_df, production_df, currency_rate)
-            daily_summary = analyzer.get_daily_summary(merged_df)
-            
-            # Convert to currency-appropriate format
-            response = {
-                'daily_summary': {
-                    'period': {
-                        'start': merged_df.index.min().isoformat(),
-                        'end': merged_df.index.max().isoformat(),
-                        'days': len(daily_summary)
-                    },
-                    'currency': currency,
-                    'days': []
-                }
+        # Merge and get daily summary
+        merged_df = analyzer.merge_data(prices_df, production_df, currency_rate)
+        daily_summary = analyzer.get_daily_summary(merged_df)
+        
+        # Convert to currency-appropriate format
+        response = {
+            'daily_summary': {
+                'period': {
+                    'start': merged_df.index.min().isoformat(),
+                    'end': merged_df.index.max().isoformat(),
+                    'days': len(daily_summary)
+                },
+                'currency': currency,
+                'days': []
             }
-            
-            # Process each day
-            for date, row in daily_summary.iterrows():
-                day_data = {
-                    'date': date.isoformat(),
-                    'production': {
-                        'total_kwh': round(float(row['production_kwh_sum']), 2),
-                        'average_kwh': round(float(row['production_kwh_mean']), 3),
-                        'max_kwh': round(float(row['production_kwh_max']), 3)
-                    },
-                    'prices': {
-                        'average': {
-                            'value': round(float(row['price_sek_per_kwh_mean']) * (currency_rate / 11.5), 4) if currency != 'SEK' else round(float(row['price_sek_per_kwh_mean']), 4),
-                            'unit': f'{currency}/kWh'
-                        },
-                        'min': {
-                            'value': round(float(row['price_sek_per_kwh_min']) * (currency_rate / 11.5), 4) if currency != 'SEK' else round(float(row['price_sek_per_kwh_min']), 4),
-                            'unit': f'{currency}/kWh'
-                        },
-                        'max': {
-                            'value': round(float(row['price_sek_per_kwh_max']) * (currency_rate / 11.5), 4) if currency != 'SEK' else round(float(row['price_sek_per_kwh_max']), 4),
-                            'unit': f'{currency}/kWh'
-                        }
-                    },
-                    'export_value': {
-                        'value': round(float(row['export_value_sek_sum']) * (currency_rate / 11.5), 2) if currency != 'SEK' else round(float(row['export_value_sek_sum']), 2),
-                        'currency': currency
-                    }
+        }
+        
+        # Convert and round whole columns at once, then build the nested day records
+        days_df = pd.DataFrame({
+            'date': daily_summary.index.strftime('%Y-%m-%d'),
+            'total_kwh': round_floats(daily_summary['production_kwh_sum'], 2),
+            'average_kwh': round_floats(daily_summary['production_kwh_mean'], 3),
+            'max_kwh': round_floats(daily_summary['production_kwh_max'], 3),
+            'avg_price': round_floats(daily_summary['price_sek_per_kwh_mean'] * currency_conversion_factor, 4),
+            'min_price': round_floats(daily_summary['price_sek_per_kwh_min'] * currency_conversion_factor, 4),
+            'max_price': round_floats(daily_summary['price_sek_per_kwh_max'] * currency_conversion_factor, 4),
+            'export_value': round_floats(daily_summary['export_value_sek_sum'] * currency_conversion_factor, 2)
+        })
+        price_unit = f'{currency}/kWh'
+
+        response['daily_summary']['days'] = [
+            {
+                'date': day.date,
+                'production': {
+                    'total_kwh': day.total_kwh,
+                    'average_kwh': day.average_kwh,
+                    'max_kwh': day.max_kwh
+                },
+                'prices': {
+                    'average': {'value': day.avg_price, 'unit': price_unit},
+                    'min': {'value': day.min_price, 'unit': price_unit},
+                    'max': {'value': day.max_price, 'unit': price_unit}
+                },
+                'export_value': {
+                    'value': day.export_value,
+                    'currency': currency
                 }
-                response['daily_summary']['days'].append(day_data)
-            
-            return safe_jsonify(response)
-            
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_filename)
-            except:
-                pass
+            }
+            for day in days_df.itertuples(index=False)
+        ]
+        
+        return safe_jsonify(response)
                 
     except Exception as e:
         logger.error(f"Daily summary analysis error: {e}")
         return jsonify({'error': str(e)}), 500
 
-@require_internal_access
 @internal_api.route('/analyze/negative-prices', methods=['POST'])
-def analyze_negative_prices_endpoint():
+@require_internal_access
+@with_uploaded_csv
+def analyze_negative_prices_endpoint(file, file_buffer, area, currency, currency_rate, start_date, end_date):
     """
     Dedicated negative price analysis endpoint.
     
@@ -550,485 +918,444 @@ def analyze_negative_prices_endpoint():
     - end_date: End date YYYY-MM-DD (optional)
     """
     try:
-        # Validate request (reuse logic from main analyze endpoint)
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
+        # Factor for converting SEK amounts to the requested currency
+        currency_conversion_factor = SEK_RATES[currency]
         
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        # Reuse shared components and run analysis
+        price_fetcher = get_price_fetcher()
+        production_loader = _PRODUCTION_LOADER
+        analyzer = _ANALYZER
         
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Only CSV files allowed'}), 400
+        # Load production data
+        production_df = production_loader.load_production_data(file_buffer)
         
-        # Get parameters
-        area = request.form.get('area')
-        if not area:
-            return jsonify({'error': 'Area code is required'}), 400
+        # Determine date range
+        production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
+        production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
         
-        currency = request.form.get('currency', 'SEK').upper()
-        start_date = request.form.get('start_date')
-        end_date = request.form.get('end_date')
-        # SECURITY: Database path hardcoded for security
-        # db_path parameter removed from public API
+        if start_date:
+            start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
+        else:
+            start_date = production_start
+            
+        if end_date:
+            end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
+        else:
+            end_date = production_end
         
-        # Validate currency
-        try:
-            currency_rate = get_currency_rate(currency)
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 400
+        # Clip production data to the period with a label slice on the sorted index
+        if not production_df.index.is_monotonic_increasing:
+            production_df = production_df.sort_index()
+        production_df = production_df.loc[start_date.tz_localize(None):end_date.tz_localize(None)]
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False) as temp_file:
-            file.save(temp_file.name)
-            temp_filename = temp_file.name
+        # Get price data and merge
+        prices_df = price_fetcher.get_price_data(area, start_date, end_date)
+        merged_df = analyzer.merge_data(prices_df, production_df, currency_rate)
         
-        try:
-            # Create components and run analysis
-            price_fetcher = PriceFetcher(db_path=SECURE_DB_PATH)
-            production_loader = ProductionLoader()
-            analyzer = PriceAnalyzer()
-            
-            # Load production data
-            production_df = production_loader.load_production_data(temp_filename)
-            
-            # Determine date range
-            production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
-            production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
-            
-            if start_date:
-                start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
-                if start_date > production_start:
-                    production_df = production_df[production_df.index >= start_date.tz_localize(None)]
-            else:
-                start_date = production_start
-                
-            if end_date:
-                end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
-                if end_date < production_end:
-                    production_df = production_df[production_df.index <= end_date.tz_localize(None)]
-            else:
-                end_date = production_end
-            
-            # Get price data and merge
-            prices_df = price_fetcher.get_price_data(area, start_date, end_date)
-            merged_df = analyzer.merge_data(prices_df, production_df, currency_rate)
-            
-            # Filter for negative price periods
-            negative_prices_df = merged_df[merged_df['price_eur_per_mwh'] < 0].copy()
-            negative_with_production = negative_prices_df[negative_prices_df['production_kwh'] > 0].copy()
-            
-            if len(negative_with_production) == 0:
-                return jsonify({
-                    'negative_price_analysis': {
-                        'has_negative_prices': False,
-                        'message': 'No production during negative price periods in the dataset',
-                        'period': {
-                            'start': merged_df.index.min().isoformat(),
-                            'end': merged_df.index.max().isoformat()
-                        }
-                    }
-                })
-            
-            # Calculate monthly breakdown
-            negative_prices_df['month'] = negative_prices_df.index.to_period('M')
-            monthly_breakdown = negative_prices_df.groupby('month').agg({
-                'production_kwh': 'sum',
-                'export_value_sek': 'sum'
-            })
-            monthly_breakdown['cost_abs'] = abs(monthly_breakdown['export_value_sek'])
-            monthly_breakdown = monthly_breakdown[monthly_breakdown['production_kwh'] > 0]
-            
-            # Calculate daily breakdown
-            negative_prices_df['date'] = negative_prices_df.index.date
-            daily_breakdown = negative_prices_df.groupby('date').agg({
-                'production_kwh': 'sum',
-                'export_value_sek': 'sum'
-            })
-            daily_breakdown['cost_abs'] = abs(daily_breakdown['export_value_sek'])
-            daily_breakdown = daily_breakdown[daily_breakdown['production_kwh'] > 0]
-            
-            # Top 10 most expensive hours
-            top_expensive = negative_with_production.nsmallest(10, 'export_value_sek')
-            
-            # Total costs and comparison
-            total_cost = abs(negative_prices_df['export_value_sek'].sum())
-            total_export_value = merged_df['export_value_sek'].sum()
-            positive_export_value = merged_df[merged_df['price_eur_per_mwh'] > 0]['export_value_sek'].sum()
-            
-            # Convert currency if needed
-            currency_conversion_factor = currency_rate / 11.5 if currency != 'SEK' else 1.0
-            
-            response = {
+        # Filter for negative price periods using boolean arrays built once
+        price_eur = merged_df['price_eur_per_mwh'].to_numpy()
+        negative_mask = price_eur < 0
+        negative_prices_df = merged_df[negative_mask]
+        negative_with_production = merged_df[negative_mask & (merged_df['production_kwh'].to_numpy() > 0)]
+        
+        if len(negative_with_production) == 0:
+            return safe_jsonify({
                 'negative_price_analysis': {
-                    'has_negative_prices': True,
+                    'has_negative_prices': False,
+                    'message': 'No production during negative price periods in the dataset',
                     'period': {
                         'start': merged_df.index.min().isoformat(),
-                        'end': merged_df.index.max().isoformat(),
-                        'total_hours': len(merged_df),
-                        'negative_price_hours': len(negative_prices_df),
-                        'negative_price_hours_with_production': len(negative_with_production)
+                        'end': merged_df.index.max().isoformat()
+                    }
+                }
+            })
+        
+        # Calculate monthly breakdown
+        monthly_breakdown = negative_prices_df.groupby(negative_prices_df.index.to_period('M')).agg({
+            'production_kwh': 'sum',
+            'export_value_sek': 'sum'
+        })
+        monthly_breakdown['cost_abs'] = np.abs(monthly_breakdown['export_value_sek'].values)
+        monthly_breakdown = monthly_breakdown[monthly_breakdown['production_kwh'] > 0]
+        
+        # Calculate daily breakdown
+        daily_breakdown = negative_prices_df.groupby(negative_prices_df.index.floor('D')).agg({
+            'production_kwh': 'sum',
+            'export_value_sek': 'sum'
+        })
+        daily_breakdown['cost_abs'] = np.abs(daily_breakdown['export_value_sek'].values)
+        daily_breakdown = daily_breakdown[daily_breakdown['production_kwh'] > 0]
+        
+        # Top 10 most expensive hours
+        export_values = negative_with_production['export_value_sek'].to_numpy()
+        top_n = min(10, len(export_values))
+        top_positions = np.argpartition(export_values, top_n - 1)[:top_n]
+        top_expensive = negative_with_production.iloc[top_positions].sort_values('export_value_sek')
+        top_columns = zip(
+            [idx.isoformat() for idx in top_expensive.index],
+            round_floats(top_expensive['production_kwh'], 3),
+            round_floats(top_expensive['price_sek_per_kwh'].to_numpy() * currency_conversion_factor, 4),
+            round_floats(np.abs(top_expensive['export_value_sek'].to_numpy()) * currency_conversion_factor, 3)
+        )
+        
+        # Monthly costs converted and rounded column-wise
+        monthly_columns = zip(
+            monthly_breakdown.index.astype(str),
+            round_floats(monthly_breakdown['production_kwh'], 1),
+            round_floats(monthly_breakdown['cost_abs'].to_numpy() * currency_conversion_factor, 2)
+        )
+        
+        # Total costs and comparison
+        total_cost = abs(negative_prices_df['export_value_sek'].sum())
+        total_export_value = merged_df['export_value_sek'].sum()
+        positive_export_value = merged_df['export_value_sek'][price_eur > 0].sum()
+        
+        response = {
+            'negative_price_analysis': {
+                'has_negative_prices': True,
+                'period': {
+                    'start': merged_df.index.min().isoformat(),
+                    'end': merged_df.index.max().isoformat(),
+                    'total_hours': len(merged_df),
+                    'negative_price_hours': len(negative_prices_df),
+                    'negative_price_hours_with_production': len(negative_with_production)
+                },
+                'currency': currency,
+                'overview': {
+                    'total_production_kwh': round(negative_prices_df['production_kwh'].sum(), 2),
+                    'average_hourly_production_kwh': round(negative_with_production['production_kwh'].mean(), 3),
+                    'max_hourly_production_kwh': round(negative_with_production['production_kwh'].max(), 3),
+                    'total_cost': {
+                        'value': round(total_cost * currency_conversion_factor, 2),
+                        'currency': currency
+                    }
+                },
+                'price_statistics': {
+                    'lowest_price': {
+                        'value': round(negative_prices_df['price_sek_per_kwh'].min() * currency_conversion_factor, 4),
+                        'unit': f'{currency}/kWh'
                     },
-                    'currency': currency,
-                    'overview': {
-                        'total_production_kwh': round(float(negative_prices_df['production_kwh'].sum()), 2),
-                        'average_hourly_production_kwh': round(float(negative_with_production['production_kwh'].mean()), 3),
-                        'max_hourly_production_kwh': round(float(negative_with_production['production_kwh'].max()), 3),
-                        'total_cost': {
-                            'value': round(total_cost * currency_conversion_factor, 2),
+                    'average_negative_price': {
+                        'value': round(negative_prices_df['price_sek_per_kwh'].mean() * currency_conversion_factor, 4),
+                        'unit': f'{currency}/kWh'
+                    }
+                },
+                'monthly_breakdown': [
+                    {
+                        'month': month,
+                        'production_kwh': production,
+                        'cost': {
+                            'value': cost,
                             'currency': currency
                         }
-                    },
-                    'price_statistics': {
-                        'lowest_price': {
-                            'value': round(float(negative_prices_df['price_sek_per_kwh'].min()) * currency_conversion_factor, 4),
+                    }
+                    for month, production, cost in monthly_columns
+                ],
+                'top_expensive_hours': [
+                    {
+                        'datetime': hour,
+                        'production_kwh': production,
+                        'price': {
+                            'value': price,
                             'unit': f'{currency}/kWh'
                         },
-                        'average_negative_price': {
-                            'value': round(float(negative_prices_df['price_sek_per_kwh'].mean()) * currency_conversion_factor, 4),
-                            'unit': f'{currency}/kWh'
+                        'cost': {
+                            'value': cost,
+                            'currency': currency
                         }
+                    }
+                    for hour, production, price, cost in top_columns
+                ],
+                'impact_analysis': {
+                    'total_export_value': {
+                        'value': round(total_export_value * currency_conversion_factor, 2),
+                        'currency': currency
                     },
-                    'monthly_breakdown': [
-                        {
-                            'month': str(month),
-                            'production_kwh': round(float(row['production_kwh']), 1),
-                            'cost': {
-                                'value': round(float(row['cost_abs']) * currency_conversion_factor, 2),
-                                'currency': currency
-                            }
-                        }
-                        for month, row in monthly_breakdown.iterrows()
-                    ],
-                    'top_expensive_hours': [
-                        {
-                            'datetime': idx.isoformat(),
-                            'production_kwh': round(float(row['production_kwh']), 3),
-                            'price': {
-                                'value': round(float(row['price_sek_per_kwh']) * currency_conversion_factor, 4),
-                                'unit': f'{currency}/kWh'
-                            },
-                            'cost': {
-                                'value': round(abs(float(row['export_value_sek'])) * currency_conversion_factor, 3),
-                                'currency': currency
-                            }
-                        }
-                        for idx, row in top_expensive.iterrows()
-                    ],
-                    'impact_analysis': {
-                        'total_export_value': {
-                            'value': round(total_export_value * currency_conversion_factor, 2),
-                            'currency': currency
-                        },
-                        'positive_price_export_value': {
-                            'value': round(positive_export_value * currency_conversion_factor, 2),
-                            'currency': currency
-                        },
-                        'negative_price_cost': {
-                            'value': round(total_cost * currency_conversion_factor, 2),
-                            'currency': currency
-                        },
-                        'income_reduction_percentage': round((total_cost / positive_export_value) * 100, 2) if positive_export_value > 0 else 0
+                    'positive_price_export_value': {
+                        'value': round(positive_export_value * currency_conversion_factor, 2),
+                        'currency': currency
                     },
-                    'daily_summary': {
-                        'days_with_negative_costs': len(daily_breakdown),
-                        'average_daily_cost': {
-                            'value': round(daily_breakdown['cost_abs'].mean() * currency_conversion_factor, 2),
+                    'negative_price_cost': {
+                        'value': round(total_cost * currency_conversion_factor, 2),
+                        'currency': currency
+                    },
+                    'income_reduction_percentage': round((total_cost / positive_export_value) * 100, 2) if positive_export_value > 0 else 0
+                },
+                'daily_summary': {
+                    'days_with_negative_costs': len(daily_breakdown),
+                    'average_daily_cost': {
+                        'value': round(daily_breakdown['cost_abs'].mean() * currency_conversion_factor, 2),
+                        'currency': currency
+                    },
+                    'most_expensive_day': {
+                        'date': daily_breakdown['cost_abs'].idxmax().strftime('%Y-%m-%d'),
+                        'cost': {
+                            'value': round(daily_breakdown['cost_abs'].max() * currency_conversion_factor, 2),
                             'currency': currency
-                        },
-                        'most_expensive_day': {
-                            'date': str(daily_breakdown['cost_abs'].idxmax()),
-                            'cost': {
-                                'value': round(daily_breakdown['cost_abs'].max() * currency_conversion_factor, 2),
-                                'currency': currency
-                            }
                         }
                     }
                 }
             }
-            
-            return safe_jsonify(response)
-            
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_filename)
-            except:
-                pass
+        }
+        
+        return safe_jsonify(response)
                 
     except Exception as e:
         logger.error(f"Negative price analysis error: {e}")
         return jsonify({'error': str(e)}), 500
 
-@require_internal_access
-@internal_api.route('/docs', methods=['GET'])
-def api_documentation():
-    """Get API documentation in JSON format."""
-    docs = {
-        'api_info': {
-            'name': 'Price Production Analysis API',
-            'version': '1.0.0',
-            'description': 'REST API for analyzing electricity prices and solar production data',
-            'base_url': request.host_url.rstrip('/')
+# Static API documentation, serialized once; only base_url varies per request
+_API_DOCS_BASE_URL = '__API_BASE_URL__'
+API_DOCS = {
+    'api_info': {
+        'name': 'Price Production Analysis API',
+        'version': '1.0.0',
+        'description': 'REST API for analyzing electricity prices and solar production data',
+        'base_url': _API_DOCS_BASE_URL
+    },
+    'endpoints': {
+        'GET /api/health': {
+            'description': 'Health check endpoint',
+            'parameters': None,
+            'response': 'JSON with service status'
         },
-        'endpoints': {
-            'GET /api/health': {
-                'description': 'Health check endpoint',
-                'parameters': None,
-                'response': 'JSON with service status'
-            },
-            'GET /api/currencies': {
-                'description': 'List supported currencies and exchange rates',
-                'parameters': None,
-                'response': 'JSON with currency list and rates'
-            },
-            'GET /api/database/info': {
-                'description': 'Get database information and statistics',
-                'parameters': None,
-                'response': 'JSON with database statistics'
-            },
-            'GET /api/database/areas': {
-                'description': 'List available electricity price areas',
-                'parameters': None,
-                'response': 'JSON with area list'
-            },
-            'POST /api/detect-csv-format': {
-                'description': 'Detect CSV file format using AI or traditional methods',
-                'parameters': {
-                    'file': 'Required CSV file upload',
-                    'use_llm': 'Optional boolean to use AI detection (default: true)'
-                },
-                'response': 'JSON with detected format and sample data'
-            },
-            'POST /api/analyze': {
-                'description': 'Analyze production data against electricity prices',
-                'parameters': {
-                    'file': 'Required CSV file with production data',
-                    'area': 'Required electricity area code (e.g., SE_4)',
-                    'currency': 'Optional target currency (default: SEK)',
-                    'start_date': 'Optional start date YYYY-MM-DD',
-                    'end_date': 'Optional end date YYYY-MM-DD'
-                },
-                'response': 'JSON with comprehensive analysis results'
+        'GET /api/currencies': {
+            'description': 'List supported currencies and exchange rates',
+            'parameters': None,
+            'response': 'JSON with currency list and rates'
+        },
+        'GET /api/database/info': {
+            'description': 'Get database information and statistics',
+            'parameters': None,
+            'response': 'JSON with database statistics'
+        },
+        'GET /api/database/areas': {
+            'description': 'List available electricity price areas',
+            'parameters': None,
+            'response': 'JSON with area list'
+        },
+        'POST /api/detect-csv-format': {
+            'description': 'Detect CSV file format using AI or traditional methods',
+            'parameters': {
+                'file': 'Required CSV file upload',
+                'use_llm': 'Optional boolean to use AI detection (default: true)'
             },
-            'POST /api/analyze/daily-summary': {
-                'description': 'Get daily summary analysis from production data',
-                'parameters': {
-                    'file': 'Required CSV file with production data',
-                    'area': 'Required electricity area code',
-                    'currency': 'Optional target currency (default: SEK)',
-                    'start_date': 'Optional start date YYYY-MM-DD',
-                    'end_date': 'Optional end date YYYY-MM-DD'
-                },
-                'response': 'JSON with daily breakdown statistics'
+            'response': 'JSON with detected format and sample data'
+        },
+        'POST /api/analyze': {
+            'description': 'Analyze production data against electricity prices',
+            'parameters': {
+                'file': 'Required CSV file with production data',
+                'area': 'Required electricity area code (e.g., SE_4)',
+                'currency': 'Optional target currency (default: SEK)',
+                'start_date': 'Optional start date YYYY-MM-DD',
+                'end_date': 'Optional end date YYYY-MM-DD',
+                'verbose': 'Optional query parameter; 1 adds EUR/MWh reference strings to prices'
             },
-            'POST /api/analyze/negative-prices': {
-                'description': 'Dedicated negative price analysis with detailed breakdown',
-                'parameters': {
-                    'file': 'Required CSV file with production data',
-                    'area': 'Required electricity area code',
-                    'currency': 'Optional target currency (default: SEK)',
-                    'start_date': 'Optional start date YYYY-MM-DD',
-                    'end_date': 'Optional end date YYYY-MM-DD'
-                },
-                'response': 'JSON with negative price analysis and cost breakdown'
+            'response': 'JSON with comprehensive analysis results'
+        },
+        'POST /api/analyze/daily-summary': {
+            'description': 'Get daily summary analysis from production data',
+            'parameters': {
+                'file': 'Required CSV file with production data',
+                'area': 'Required electricity area code',
+                'currency': 'Optional target currency (default: SEK)',
+                'start_date': 'Optional start date YYYY-MM-DD',
+                'end_date': 'Optional end date YYYY-MM-DD'
             },
-            'GET /api/docs': {
-                'description': 'Get this API documentation',
-                'parameters': None,
-                'response': 'JSON with API documentation'
+            'response': 'JSON with daily breakdown statistics'
+        },
+        'POST /api/analyze/negative-prices': {
+            'description': 'Dedicated negative price analysis with detailed breakdown',
+            'parameters': {
+                'file': 'Required CSV file with production data',
+                'area': 'Required electricity area code',
+                'currency': 'Optional target currency (default: SEK)',
+                'start_date': 'Optional start date YYYY-MM-DD',
+                'end_date': 'Optional end date YYYY-MM-DD'
             },
-            'GET /api/graph/price-timeline': {
-                'description': 'Get price data in timeline format for graphing',
-                'parameters': {
-                    'area': 'Required electricity area code',
-                    'start_date': 'Optional start date YYYY-MM-DD',
-                    'end_date': 'Optional end date YYYY-MM-DD',
-                    'currency': 'Optional target currency (default: EUR)',
-                    'resolution': 'Optional resolution: hourly, daily, weekly (default: hourly)'
-                },
-                'response': 'JSON with timeline data for charts'
+            'response': 'JSON with negative price analysis and cost breakdown'
+        },
+        'GET /api/docs': {
+            'description': 'Get this API documentation',
+            'parameters': None,
+            'response': 'JSON with API documentation'
+        },
+        'GET /api/graph/price-timeline': {
+            'description': 'Get price data in timeline format for graphing',
+            'parameters': {
+                'area': 'Required electricity area code',
+                'start_date': 'Optional start date YYYY-MM-DD',
+                'end_date': 'Optional end date YYYY-MM-DD',
+                'currency': 'Optional target currency (default: EUR)',
+                'resolution': 'Optional resolution: hourly, daily, weekly (default: hourly)'
             },
-            'GET /api/graph/price-distribution': {
-                'description': 'Get price distribution data for histograms',
-                'parameters': {
-                    'area': 'Required electricity area code',
-                    'start_date': 'Optional start date YYYY-MM-DD',
-                    'end_date': 'Optional end date YYYY-MM-DD',
-                    'currency': 'Optional target currency (default: EUR)',
-                    'bins': 'Optional number of histogram bins (default: 50)'
-                },
-                'response': 'JSON with distribution data for histograms'
+            'response': 'JSON with timeline data for charts'
+        },
+        'GET /api/graph/price-distribution': {
+            'description': 'Get price distribution data for histograms',
+            'parameters': {
+                'area': 'Required electricity area code',
+                'start_date': 'Optional start date YYYY-MM-DD',
+                'end_date': 'Optional end date YYYY-MM-DD',
+                'currency': 'Optional target currency (default: EUR)',
+                'bins': 'Optional number of histogram bins (default: 50)'
             },
-            'GET /api/graph/negative-price-periods': {
-                'description': 'Get negative price periods data for visualization',
-                'parameters': {
-                    'area': 'Required electricity area code',
-                    'start_date': 'Optional start date YYYY-MM-DD',
-                    'end_date': 'Optional end date YYYY-MM-DD',
-                    'currency': 'Optional target currency (default: EUR)'
-                },
-                'response': 'JSON with negative price periods and detailed breakdown'
-            }
+            'response': 'JSON with distribution data for histograms'
         },
-        'supported_currencies': list(CURRENCY_RATES.keys()),
-        'supported_areas': [
-            'SE_1', 'SE_2', 'SE_3', 'SE_4',  # Sweden
-            'NO_1', 'NO_2', 'NO_3', 'NO_4', 'NO_5',  # Norway
-            'DK_1', 'DK_2',  # Denmark
-            'FI'  # Finland
-        ],
-        'file_formats': {
-            'production_csv': {
-                'description': 'CSV file with solar production data',
-                'required_columns': ['datetime', 'production'],
-                'supported_separators': [',', ';'],
-                'supported_encodings': ['utf-8', 'iso-8859-1', 'cp1252'],
-                'example_headers': [
-                    'Datum;Produktion kWh',
-                    'Date,Production kWh',
-                    'DateTime,kWh'
-                ]
-            }
+        'GET /api/graph/negative-price-periods': {
+            'description': 'Get negative price periods data for visualization',
+            'parameters': {
+                'area': 'Required electricity area code',
+                'start_date': 'Optional start date YYYY-MM-DD',
+                'end_date': 'Optional end date YYYY-MM-DD',
+                'currency': 'Optional target currency (default: EUR)',
+                'detail': 'Optional boolean to include per-period breakdown (default: true)'
+            },
+            'response': 'JSON with negative price periods and detailed breakdown'
         },
-        'examples': {
-            'analyze_request': {
-                'method': 'POST',
-                'url': '/api/analyze',
-                'form_data': {
-                    'file': '@production.csv',
-                    'area': 'SE_4',
-                    'currency': 'SEK',
-                    'start_date': '2025-06-01',
-                    'end_date': '2025-06-30'
-                }
+        'GET /api/graph/batch': {
+            'description': 'Get price summaries for several areas in one request',
+            'parameters': {
+                'areas': f'Required comma-separated area codes (at most {GRAPH_BATCH_MAX_AREAS})',
+                'start_date': 'Optional start date YYYY-MM-DD',
+                'end_date': 'Optional end date YYYY-MM-DD',
+                'currency': 'Optional target currency (default: EUR)'
+            },
+            'response': 'JSON with a price summary per area'
+        }
+    },
+    'supported_currencies': list(CURRENCY_RATES.keys()),
+    'supported_areas': [
+        'SE_1', 'SE_2', 'SE_3', 'SE_4',  # Sweden
+        'NO_1', 'NO_2', 'NO_3', 'NO_4', 'NO_5',  # Norway
+        'DK_1', 'DK_2',  # Denmark
+        'FI'  # Finland
+    ],
+    'file_formats': {
+        'production_csv': {
+            'description': 'CSV file with solar production data',
+            'required_columns': ['datetime', 'production'],
+            'supported_separators': [',', ';'],
+            'supported_encodings': ['utf-8', 'iso-8859-1', 'cp1252'],
+            'example_headers': [
+                'Datum;Produktion kWh',
+                'Date,Production kWh',
+                'DateTime,kWh'
+            ]
+        }
+    },
+    'examples': {
+        'analyze_request': {
+            'method': 'POST',
+            'url': '/api/analyze',
+            'form_data': {
+                'file': '@production.csv',
+                'area': 'SE_4',
+                'currency': 'SEK',
+                'start_date': '2025-06-01',
+                'end_date': '2025-06-30'
             }
         }
     }
-    
-    return jsonify(docs)
+}
+_API_DOCS_JSON = orjson.dumps(API_DOCS)
+_API_DOCS_PLACEHOLDER = orjson.dumps(_API_DOCS_BASE_URL)
 
+@internal_api.route('/docs', methods=['GET'])
 @require_internal_access
+def api_documentation():
+    """Get API documentation in JSON format."""
+    base_url = orjson.dumps(request.host_url.rstrip('/'))
+    response = make_response(_API_DOCS_JSON.replace(_API_DOCS_PLACEHOLDER, base_url, 1))
+    response.headers['Content-Type'] = 'application/json'
+    return response
+
 @internal_api.route('/analyze/export', methods=['POST'])
-def analyze_and_export():
-    """
-    Analyze production data and return merged CSV data.
-    
-    Expected form data (same as /analyze):
-    - file: CSV file with production data
-    - area: Electricity area code (e.g., SE_4)
-    - currency: Currency for display (optional, default: SEK)
-    - start_date: Start date YYYY-MM-DD (optional)
-    - end_date: End date YYYY-MM-DD (optional)
+@require_internal_access
+@with_uploaded_csv
+def analyze_and_export(file, file_buffer, area, currency, currency_rate, start_date, end_date):
     """
-    try:
-        # Validate request (reuse logic from main analyze endpoint)
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Only CSV files allowed'}), 400
-        
-        # Get parameters
-        area = request.form.get('area')
-        if not area:
-            return jsonify({'error': 'Area code is required'}), 400
-        
-        currency = request.form.get('currency', 'SEK').upper()
-        start_date = request.form.get('start_date')
-        end_date = request.form.get('end_date')
-        # SECURITY: Database path hardcoded for security
-        # db_path parameter removed from public API
-        
-        # Validate currency
-        try:
-            currency_rate = get_currency_rate(currency)
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 400
-        
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False) as temp_file:
-            file.save(temp_file.name)
-            temp_filename = temp_file.name
-        
-        try:
-            # Create components and run analysis
-            price_fetcher = PriceFetcher(db_path=SECURE_DB_PATH)
-            production_loader = ProductionLoader()
-            analyzer = PriceAnalyzer()
-            
-            # Load production data
-            production_df = production_loader.load_production_data(temp_filename)
-            
-            # Determine date range
-            production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
-            production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
-            
-            if start_date:
-                start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
-                if start_date > production_start:
-                    production_df = production_df[production_df.index >= start_date.tz_localize(None)]
-            else:
-                start_date = production_start
-                
-            if end_date:
-                end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
-                if end_date < production_end:
-                    production_df = production_df[production_df.index <= end_date.tz_localize(None)]
-            else:
-                end_date = production_end
-            
-            # Get price data
-            prices_df = price_fetcher.get_price_data(area, start_date, end_date)
-            
-            # Merge data
-            merged_df = analyzer.merge_data(prices_df, production_df, currency_rate)
-            
-            # Convert currency columns if needed
-            if currency != 'SEK':
-                conversion_factor = currency_rate / 11.5
-                # Create currency-specific columns
-                merged_df[f'price_{currency.lower()}_per_kwh'] = merged_df['price_sek_per_kwh'] * conversion_factor
-                merged_df[f'export_value_{currency.lower()}'] = merged_df['export_value_sek'] * conversion_factor
-                merged_df[f'price_daily_avg_{currency.lower()}_per_kwh'] = merged_df['price_sek_per_kwh'] * conversion_factor
-                merged_df[f'export_value_daily_{currency.lower()}'] = merged_df['export_value_sek'] * conversion_factor
-            
-            # Create CSV output
-            import io
-            output = io.StringIO()
-            merged_df.to_csv(output)
-            csv_content = output.getvalue()
-            
-            # Create filename
-            safe_filename = secure_filename(file.filename)
-            base_name = safe_filename.rsplit('.', 1)[0] if '.' in safe_filename else safe_filename
-            export_filename = f'{base_name}_analysis_{area}_{currency}.csv'
-            
-            # Create response
-            response = make_response(csv_content)
-            response.headers['Content-Type'] = 'text/csv'
-            response.headers['Content-Disposition'] = f'attachment; filename={export_filename}'
-            
-            return response
+    Analyze production data and return merged CSV data.
+    
+    Expected form data (same as /analyze):
+    - file: CSV file with production data
+    - area: Electricity area code (e.g., SE_4)
+    - currency: Currency for display (optional, default: SEK)
+    - start_date: Start date YYYY-MM-DD (optional)
+    - end_date: End date YYYY-MM-DD (optional)
+    """
+    try:
+        # Factor for converting SEK amounts to the requested currency
+        currency_conversion_factor = SEK_RATES[currency]
+        
+        # Reuse shared components and run analysis
+        price_fetcher = get_price_fetcher()
+        production_loader = _PRODUCTION_LOADER
+        analyzer = _ANALYZER
+        
+        # Load production data
+        production_df = production_loader.load_production_data(file_buffer)
+        
+        # Determine date range
+        production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
+        production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
+        
+        if start_date:
+            start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
+        else:
+            start_date = production_start
             
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_filename)
-            except:
-                pass
+        if end_date:
+            end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
+        else:
+            end_date = production_end
+        
+        # Clip production data to the period with a label slice on the sorted index
+        if not production_df.index.is_monotonic_increasing:
+            production_df = production_df.sort_index()
+        production_df = production_df.loc[start_date.tz_localize(None):end_date.tz_localize(None)]
+        
+        # Get price data
+        prices_df = price_fetcher.get_price_data(area, start_date, end_date)
+        
+        # Merge data
+        merged_df = analyzer.merge_data(prices_df, production_df, currency_rate)
+        
+        # Convert currency columns if needed
+        if currency != 'SEK':
+            # Create currency-specific columns; the daily ones come from the
+            # daily aggregates merge_data already computed, not the hourly values
+            suffix = currency.lower()
+            merged_df[f'price_{suffix}_per_kwh'] = merged_df['price_sek_per_kwh'].to_numpy() * currency_conversion_factor
+            merged_df[f'export_value_{suffix}'] = merged_df['export_value_sek'].to_numpy() * currency_conversion_factor
+            merged_df[f'price_daily_avg_{suffix}_per_kwh'] = (merged_df['price_daily_avg'].to_numpy() * currency_rate) / 1000 * currency_conversion_factor
+            merged_df[f'export_value_daily_{suffix}'] = merged_df['export_value_daily_sek'].to_numpy() * currency_conversion_factor
+        
+        # Stream CSV output in row chunks instead of building one string
+        def generate_csv():
+            for start in range(0, max(len(merged_df), 1), CSV_EXPORT_CHUNK_ROWS):
+                yield merged_df.iloc[start:start + CSV_EXPORT_CHUNK_ROWS].to_csv(header=(start == 0))
+        
+        # Create filename
+        safe_filename = secure_filename(file.filename)
+        base_name = safe_filename.rsplit('.', 1)[0] if '.' in safe_filename else safe_filename
+        export_filename = f'{base_name}_analysis_{area}_{currency}.csv'
+        
+        # Create response
+        response = Response(generate_csv(), content_type='text/csv')
+        response.headers['Content-Disposition'] = f'attachment; filename={export_filename}'
+        
+        return response
                 
     except Exception as e:
         logger.error(f"Export analysis error: {e}")
         return jsonify({'error': str(e)}), 500
 
-@require_internal_access
 @internal_api.route('/analyze', methods=['POST'])
-def analyze_production():
+@require_internal_access
+@with_uploaded_csv
+def analyze_production(file, file_buffer, area, currency, currency_rate, start_date, end_date):
     """
     Analyze production data against electricity prices.
     
@@ -1038,153 +1365,90 @@ def analyze_production():
     - currency: Currency for display (optional, default: SEK)
     - start_date: Start date YYYY-MM-DD (optional)
     - end_date: End date YYYY-MM-DD (optional)
+    
+    Query parameters:
+    - verbose: Set to 1 to include EUR/MWh reference strings with local prices
     """
     try:
-        # Validate request
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Only CSV files allowed'}), 400
-        
-        # Get parameters
-        area = request.form.get('area')
-        if not area:
-            return jsonify({'error': 'Area code is required'}), 400
-        
-        currency = request.form.get('currency', 'SEK').upper()
-        start_date = request.form.get('start_date')
-        end_date = request.form.get('end_date')
-        # SECURITY: Database path hardcoded for security
-        # db_path parameter removed from public API
-        
-        # Validate currency
-        try:
-            currency_rate = get_currency_rate(currency)
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 400
-        
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False) as temp_file:
-            file.save(temp_file.name)
-            temp_filename = temp_file.name
-        
-        try:
-            # Create components and run analysis
-            price_fetcher = PriceFetcher(db_path=SECURE_DB_PATH)
-            production_loader = ProductionLoader()
-            analyzer = PriceAnalyzer()
-            
-            # Load production data
-            production_df = production_loader.load_production_data(temp_filename)
-            
-            # Determine date range
-            production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
-            production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
-            
-            if start_date:
-                start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
-                if start_date > production_start:
-                    production_df = production_df[production_df.index >= start_date.tz_localize(None)]
-            else:
-                start_date = production_start
-                
-            if end_date:
-                end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
-                if end_date < production_end:
-                    production_df = production_df[production_df.index <= end_date.tz_localize(None)]
-            else:
-                end_date = production_end
-            
-            # Get price data
-            prices_df = price_fetcher.get_price_data(area, start_date, end_date)
-            
-            # Merge and analyze
-            merged_df = analyzer.merge_data(prices_df, production_df, currency_rate)
-            analysis = analyzer.analyze_data(merged_df)
-            
-            # Format response with appropriate currency
-            def format_price_response(price_eur_per_mwh):
-                if currency == 'EUR':
-                    return {
-                        'value': price_eur_per_mwh,
-                        'unit': 'EUR/MWh',
-                        'display': f"{price_eur_per_mwh:.2f} EUR/MWh"
-                    }
-                else:
-                    price_local_kwh = (price_eur_per_mwh * currency_rate) / 1000
-                    return {
-                        'value': price_local_kwh,
-                        'unit': f'{currency}/kWh',
-                        'display': f"{price_local_kwh:.4f} {currency}/kWh",
-                        'reference': f"{price_eur_per_mwh:.2f} EUR/MWh"
-                    }
-            
-            # Build response with data type conversion
-            response = {
-                'analysis': {
-                    'period': {
-                        'days': int(analysis['period_days']),
-                        'hours': int(analysis['total_hours']),
-                        'start': merged_df.index.min().isoformat(),
-                        'end': merged_df.index.max().isoformat()
-                    },
-                    'prices': {
-                        'currency': currency,
-                        'min': format_price_response(float(analysis['price_min_eur_mwh'])),
-                        'max': format_price_response(float(analysis['price_max_eur_mwh'])),
-                        'mean': format_price_response(float(analysis['price_mean_eur_mwh'])),
-                        'median': format_price_response(float(analysis['price_median_eur_mwh']))
-                    },
-                    'production': {
-                        'total_kwh': round(float(analysis['production_total']), 2),
-                        'average_hourly_kwh': round(float(analysis['production_mean']), 3),
-                        'max_hourly_kwh': round(float(analysis['production_max']), 3),
-                        'hours_with_production': int(analysis['hours_with_production'])
-                    },
-                    'negative_prices': {
-                        'hours_count': int(analysis['negative_price_hours']),
-                        'production_kwh': round(float(analysis['production_during_negative_prices']), 2),
-                        'average_production_kwh': round(float(analysis['avg_production_during_negative_prices']), 3),
-                        'lowest_price': format_price_response(float(analysis['price_min_eur_mwh'])) if analysis['negative_price_hours'] > 0 else None,
-                        'average_negative_price': format_price_response(float(analysis['price_mean_eur_mwh'])) if analysis['negative_price_hours'] > 0 else None,
-                        'total_cost': {
-                            'value': round(float(analysis['negative_export_cost_abs_sek']) * (currency_rate / 11.5), 2),  # Convert from SEK
-                            'currency': currency
-                        } if analysis['negative_price_hours'] > 0 else None
-                    },
-                    'export_value': {
-                        'total': {
-                            'value': round(float(analysis['total_export_value_sek']) * (currency_rate / 11.5), 2),  # Convert from SEK
-                            'currency': currency
-                        },
-                        'positive_prices': {
-                            'value': round(float(analysis['positive_export_value_sek']) * (currency_rate / 11.5), 2),  # Convert from SEK
-                            'currency': currency
-                        }
-                    }
+        # Factors for converting SEK amounts, and EUR/MWh prices to per-kWh prices,
+        # to the requested currency
+        currency_conversion_factor = SEK_RATES[currency]
+        local_kwh_factor = currency_rate / 1000
+        
+        analysis, period_start, period_end, record_count = analyze_upload(
+            file_buffer, area, currency, currency_rate, start_date, end_date)
+        
+        # The EUR/MWh reference string is only built for clients that ask for it
+        verbose = request.args.get('verbose') == '1'
+        
+        # Format response with appropriate currency
+        def format_price_response(price_eur_per_mwh):
+            if currency == 'EUR':
+                return {'value': price_eur_per_mwh, 'unit': 'EUR/MWh'}
+            price = {'value': price_eur_per_mwh * local_kwh_factor, 'unit': f'{currency}/kWh'}
+            if verbose:
+                price['reference'] = np.format_float_positional(
+                    price_eur_per_mwh, precision=2, unique=False) + ' EUR/MWh'
+            return price
+        
+        # Convert the headline prices once; the negative-price block reuses them
+        price_min = format_price_response(analysis['price_min_eur_mwh'])
+        price_mean = format_price_response(analysis['price_mean_eur_mwh'])
+        
+        # Build response; orjson serializes the NumPy scalars in analysis natively
+        response = {
+            'analysis': {
+                'period': {
+                    'days': analysis['period_days'],
+                    'hours': analysis['total_hours'],
+                    'start': period_start,
+                    'end': period_end
                 },
-                'metadata': {
-                    'area_code': area,
+                'prices': {
                     'currency': currency,
-                    'exchange_rate_eur': float(currency_rate),
-                    'file_processed': secure_filename(file.filename),
-                    'database_records_used': int(len(merged_df))
+                    'min': price_min,
+                    'max': format_price_response(analysis['price_max_eur_mwh']),
+                    'mean': price_mean,
+                    'median': format_price_response(analysis['price_median_eur_mwh'])
+                },
+                'production': {
+                    'total_kwh': round(analysis['production_total'], 2),
+                    'average_hourly_kwh': round(analysis['production_mean'], 3),
+                    'max_hourly_kwh': round(analysis['production_max'], 3),
+                    'hours_with_production': analysis['hours_with_production']
+                },
+                'negative_prices': {
+                    'hours_count': analysis['negative_price_hours'],
+                    'production_kwh': round(analysis['production_during_negative_prices'], 2),
+                    'average_production_kwh': round(analysis['avg_production_during_negative_prices'], 3),
+                    'lowest_price': price_min if analysis['negative_price_hours'] > 0 else None,
+                    'average_negative_price': price_mean if analysis['negative_price_hours'] > 0 else None,
+                    'total_cost': {
+                        'value': round(analysis['negative_export_cost_abs_sek'] * currency_conversion_factor, 2),  # Convert from SEK
+                        'currency': currency
+                    } if analysis['negative_price_hours'] > 0 else None
+                },
+                'export_value': {
+                    'total': {
+                        'value': round(analysis['total_export_value_sek'] * currency_conversion_factor, 2),  # Convert from SEK
+                        'currency': currency
+                    },
+                    'positive_prices': {
+                        'value': round(analysis['positive_export_value_sek'] * currency_conversion_factor, 2),  # Convert from SEK
+                        'currency': currency
+                    }
                 }
+            },
+            'metadata': {
+                'area_code': area,
+                'currency': currency,
+                'exchange_rate_eur': currency_rate,
+                'file_processed': secure_filename(file.filename),
+                'database_records_used': record_count
             }
-            
-            return safe_jsonify(response)
-            
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_filename)
-            except:
-                pass
+        }
+        
+        return safe_jsonify(response)
                 
     except Exception as e:
         logger.error(f"Analysis error: {e}")
@@ -1197,8 +1461,9 @@ def too_large(e):
 
 # Graph Data Endpoints for Frontend
 
-@require_internal_access
 @internal_api.route('/graph/price-timeline', methods=['GET'])
+@require_internal_access
+@cached_graph_response
 def get_price_timeline():
     """Get price data in timeline format for graphing."""
     try:
@@ -1217,73 +1482,52 @@ def get_price_timeline():
         if not Path(SECURE_DB_PATH).exists():
             return jsonify({'error': f'Database not found'}), 404
             
-        with sqlite3.connect(SECURE_DB_PATH) as conn:
-            # Build query with optional date filtering
-            if start_date and end_date:
-                query = '''SELECT datetime, price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime BETWEEN ? AND ? 
-                          ORDER BY datetime'''
-                df = pd.read_sql_query(query, conn, params=[area, start_date, end_date])
-            elif start_date:
-                query = '''SELECT datetime, price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime >= ? 
-                          ORDER BY datetime'''
-                df = pd.read_sql_query(query, conn, params=[area, start_date])
-            elif end_date:
-                query = '''SELECT datetime, price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime <= ? 
-                          ORDER BY datetime'''
-                df = pd.read_sql_query(query, conn, params=[area, end_date])
-            else:
-                query = '''SELECT datetime, price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? ORDER BY datetime'''
-                df = pd.read_sql_query(query, conn, params=[area])
+        # Get exchange rate; prices are converted by the query itself
+        currency_rate = CURRENCY_RATES.get(currency, 1.0)
+        
+        where, params = price_range_filter(area, start_date, end_date)
+        with read_connection() as conn:
+            df = pd.read_sql_query(
+                f'SELECT datetime, price_eur_per_mwh * ? AS price FROM price_data WHERE {where} ORDER BY datetime',
+                conn, params=[currency_rate] + params,
+                index_col='datetime', parse_dates=PRICE_SQL_PARSE_DATES, dtype=PRICE_SQL_DTYPES)
                 
         if df.empty:
             return jsonify({'error': f'No data found for area {area}'}), 404
             
-        # Convert datetime to pandas datetime index
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df.set_index('datetime', inplace=True)
-            
-        # Get exchange rate
-        currency_rate = CURRENCY_RATES.get(currency, 1.0)
-        
         # Process data based on resolution
-        if resolution == 'daily':
-            df_resampled = df.resample('D').agg({
-                'price_eur_per_mwh': ['mean', 'min', 'max', 'std']
-            }).round(2)
-            df_resampled.columns = ['price_mean', 'price_min', 'price_max', 'price_std']
-        elif resolution == 'weekly':
-            df_resampled = df.resample('W').agg({
-                'price_eur_per_mwh': ['mean', 'min', 'max', 'std']
-            }).round(2)
+        if resolution in ('daily', 'weekly'):
+            # Group on a bucket key rather than resample; weekly buckets run
+            # Monday-Sunday and are labelled by their Sunday, as with resample('W')
+            if resolution == 'daily':
+                bucket = df.index.floor('D')
+            else:
+                bucket = df.index.to_period('W').end_time.normalize()
+            df_resampled = df['price'].groupby(bucket).agg(['mean', 'min', 'max', 'std'])
             df_resampled.columns = ['price_mean', 'price_min', 'price_max', 'price_std']
-        else:  # hourly (default)
-            df_resampled = df.copy()
-            df_resampled['price_mean'] = df_resampled['price_eur_per_mwh']
-            df_resampled['price_min'] = df_resampled['price_eur_per_mwh'] 
-            df_resampled['price_max'] = df_resampled['price_eur_per_mwh']
-            df_resampled['price_std'] = 0
-            
-        # Convert to target currency
-        for col in ['price_mean', 'price_min', 'price_max']:
-            df_resampled[col] = df_resampled[col] * currency_rate
-            
-        # Build timeline data
-        timeline_data = []
-        for timestamp, row in df_resampled.iterrows():
-            timeline_data.append({
-                'timestamp': timestamp.isoformat(),
-                'price': round(float(row['price_mean']), 2),
-                'price_min': round(float(row['price_min']), 2) if resolution != 'hourly' else None,
-                'price_max': round(float(row['price_max']), 2) if resolution != 'hourly' else None,
-                'price_std': round(float(row['price_std']), 2) if resolution != 'hourly' else None,
-                'is_negative': float(row['price_mean']) < 0
-            })
+        else:  # hourly (default): each price is its own point, with no spread columns
+            df.columns = ['price_mean']
+            df_resampled = df
+            
+        has_spread = 'price_min' in df_resampled
+        price_low = df_resampled['price_min'] if has_spread else df_resampled['price_mean']
+        price_high = df_resampled['price_max'] if has_spread else df_resampled['price_mean']
+            
+        # Build timeline data column-wise
+        timeline_df = pd.DataFrame({
+            'timestamp': df_resampled.index.strftime('%Y-%m-%dT%H:%M:%S'),
+            'price': round_floats(df_resampled['price_mean'], 2)
+        })
+        for col in ['price_min', 'price_max', 'price_std']:
+            timeline_df[col] = round_floats(df_resampled[col], 2) if has_spread else None
+        timeline_df['is_negative'] = df_resampled['price_mean'].to_numpy() < 0
+        timeline_data = timeline_df.to_dict(orient='records')
+        
+        # Round the summary statistics together
+        min_price, max_price, avg_price = round_floats(
+            [price_low.min(), price_high.max(), df_resampled['price_mean'].mean()], 2)
             
-        return jsonify({
+        return safe_jsonify({
             'area': area,
             'currency': currency,
             'resolution': resolution,
@@ -1294,9 +1538,9 @@ def get_price_timeline():
             },
             'timeline': timeline_data,
             'statistics': {
-                'min_price': round(float(df_resampled['price_min'].min()), 2),
-                'max_price': round(float(df_resampled['price_max'].max()), 2),
-                'avg_price': round(float(df_resampled['price_mean'].mean()), 2),
+                'min_price': min_price,
+                'max_price': max_price,
+                'avg_price': avg_price,
                 'negative_hours': int((df_resampled['price_mean'] < 0).sum())
             }
         })
@@ -1305,8 +1549,9 @@ def get_price_timeline():
         logger.error(f"Error getting price timeline: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@require_internal_access
 @internal_api.route('/graph/price-distribution', methods=['GET'])
+@require_internal_access
+@cached_graph_response
 def get_price_distribution():
     """Get price distribution data for histograms."""
     try:
@@ -1325,80 +1570,79 @@ def get_price_distribution():
         if not Path(SECURE_DB_PATH).exists():
             return jsonify({'error': f'Database not found'}), 404
             
-        with sqlite3.connect(SECURE_DB_PATH) as conn:
-            # Build query with optional date filtering
-            if start_date and end_date:
-                query = '''SELECT price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime BETWEEN ? AND ?'''
-                df = pd.read_sql_query(query, conn, params=[area, start_date, end_date])
-            elif start_date:
-                query = '''SELECT price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime >= ?'''
-                df = pd.read_sql_query(query, conn, params=[area, start_date])
-            elif end_date:
-                query = '''SELECT price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime <= ?'''
-                df = pd.read_sql_query(query, conn, params=[area, end_date])
+        # Get exchange rate; prices are converted by the query itself
+        currency_rate = CURRENCY_RATES.get(currency, 1.0)
+        
+        where, params = price_range_filter(area, start_date, end_date)
+        prices_sql = f'SELECT datetime, price_eur_per_mwh * ? AS price FROM price_data WHERE {where}'
+        prices_params = [currency_rate] + params
+        
+        with read_connection() as conn:
+            # Summary statistics in a single scan
+            total_hours, min_price, max_price, mean_price, negative_hours, first, last = conn.execute(
+                f'''SELECT COUNT(*), MIN(price), MAX(price), AVG(price),
+                          SUM(price < 0), MIN(datetime), MAX(datetime)
+                   FROM ({prices_sql})''', prices_params).fetchone()
+                   
+            if not total_hours:
+                return jsonify({'error': f'No data found for area {area}'}), 404
+            
+            # Sample variance from squared deviations around the known mean; a
+            # one-pass sum of squares loses precision to cancellation
+            if total_hours > 1:
+                squared_deviations, = conn.execute(
+                    f'SELECT SUM((price - ?) * (price - ?)) FROM ({prices_sql})',
+                    [mean_price, mean_price] + prices_params).fetchone()
+                std_price = round(math.sqrt(squared_deviations / (total_hours - 1)), 2)
             else:
-                query = '''SELECT price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ?'''
-                df = pd.read_sql_query(query, conn, params=[area])
+                std_price = None
                 
-        if df.empty:
-            return jsonify({'error': f'No data found for area {area}'}), 404
-            
-        # Get exchange rate and convert prices
-        currency_rate = CURRENCY_RATES.get(currency, 1.0)
-        prices = df['price_eur_per_mwh'] * currency_rate
-        
-        # Calculate histogram
-        import numpy as np
-        hist, bin_edges = np.histogram(prices, bins=bins)
-        
-        # Build distribution data
-        distribution_data = []
-        for i in range(len(hist)):
-            distribution_data.append({
-                'bin_start': round(float(bin_edges[i]), 2),
-                'bin_end': round(float(bin_edges[i + 1]), 2),
-                'bin_center': round(float((bin_edges[i] + bin_edges[i + 1]) / 2), 2),
-                'count': int(hist[i]),
-                'percentage': round(float(hist[i] / len(prices) * 100), 2)
-            })
-            
-        # Get the date range for response
-        with sqlite3.connect(SECURE_DB_PATH) as conn:
-            date_query = '''SELECT MIN(datetime), MAX(datetime) FROM price_data 
-                           WHERE area_code = ?'''
-            if start_date and end_date:
-                date_query += ' AND datetime BETWEEN ? AND ?'
-                date_range = conn.execute(date_query, [area, start_date, end_date]).fetchone()
-            elif start_date:
-                date_query += ' AND datetime >= ?'
-                date_range = conn.execute(date_query, [area, start_date]).fetchone()
-            elif end_date:
-                date_query += ' AND datetime <= ?'
-                date_range = conn.execute(date_query, [area, end_date]).fetchone()
+            # Median: the middle price, or the mean of the middle two
+            middle_count = 2 - total_hours % 2
+            median_price, = conn.execute(
+                f'SELECT AVG(price) FROM (SELECT price FROM ({prices_sql}) ORDER BY price LIMIT ? OFFSET ?)',
+                prices_params + [middle_count, (total_hours - 1) // 2]).fetchone()
+            
+            # Histogram with equal-width bins over [min, max], binned as np.histogram does
+            if min_price == max_price:
+                bin_edges = np.linspace(min_price - 0.5, max_price + 0.5, bins + 1)
             else:
-                date_range = conn.execute(date_query, [area]).fetchone()
+                bin_edges = np.linspace(min_price, max_price, bins + 1)
+            bin_counts = conn.execute(
+                f'''SELECT MIN(CAST((price - ?) * ? AS INTEGER), ?), COUNT(*)
+                   FROM ({prices_sql}) GROUP BY 1''',
+                [bin_edges[0], bins / (bin_edges[-1] - bin_edges[0]), bins - 1] + prices_params).fetchall()
                 
-        return jsonify({
+        hist = np.zeros(bins, dtype=np.int64)
+        bin_index, counts = zip(*bin_counts)
+        hist[list(bin_index)] = counts
+        
+        # Build distribution data column-wise
+        distribution_data = pd.DataFrame({
+            'bin_start': round_floats(bin_edges[:-1], 2),
+            'bin_end': round_floats(bin_edges[1:], 2),
+            'bin_center': round_floats((bin_edges[:-1] + bin_edges[1:]) / 2, 2),
+            'count': hist,
+            'percentage': round_floats(hist / total_hours * 100, 2)
+        }).to_dict(orient='records')
+                
+        return safe_jsonify({
             'area': area,
             'currency': currency,
-            'total_hours': len(prices),
+            'total_hours': total_hours,
             'date_range': {
-                'start': date_range[0] if date_range and date_range[0] else None,
-                'end': date_range[1] if date_range and date_range[1] else None
+                'start': first,
+                'end': last
             },
             'distribution': distribution_data,
             'statistics': {
-                'min_price': round(float(prices.min()), 2),
-                'max_price': round(float(prices.max()), 2),
-                'mean_price': round(float(prices.mean()), 2),
-                'median_price': round(float(prices.median()), 2),
-                'std_price': round(float(prices.std()), 2),
-                'negative_hours': int((prices < 0).sum()),
-                'negative_percentage': round(float((prices < 0).sum() / len(prices) * 100), 2)
+                'min_price': round(min_price, 2),
+                'max_price': round(max_price, 2),
+                'mean_price': round(mean_price, 2),
+                'median_price': round(median_price, 2),
+                'std_price': std_price,
+                'negative_hours': negative_hours,
+                'negative_percentage': round(negative_hours / total_hours * 100, 2)
             }
         })
         
@@ -1406,8 +1650,9 @@ def get_price_distribution():
         logger.error(f"Error getting price distribution: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@require_internal_access
 @internal_api.route('/graph/negative-price-periods', methods=['GET'])
+@require_internal_access
+@cached_graph_response
 def get_negative_price_periods():
     """Get negative price periods data for visualization."""
     try:
@@ -1416,6 +1661,7 @@ def get_negative_price_periods():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         currency = request.args.get('currency', 'EUR')
+        detail = request.args.get('detail', 'true').lower() in ('true', '1')
         # SECURITY: Database path hardcoded for security
         
         if not area:
@@ -1425,94 +1671,103 @@ def get_negative_price_periods():
         if not Path(SECURE_DB_PATH).exists():
             return jsonify({'error': f'Database not found'}), 404
             
-        with sqlite3.connect(SECURE_DB_PATH) as conn:
-            # Build query with optional date filtering
-            if start_date and end_date:
-                query = '''SELECT datetime, price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime BETWEEN ? AND ? 
-                          ORDER BY datetime'''
-                df = pd.read_sql_query(query, conn, params=[area, start_date, end_date])
-            elif start_date:
-                query = '''SELECT datetime, price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime >= ? 
-                          ORDER BY datetime'''
-                df = pd.read_sql_query(query, conn, params=[area, start_date])
-            elif end_date:
-                query = '''SELECT datetime, price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? AND datetime <= ? 
-                          ORDER BY datetime'''
-                df = pd.read_sql_query(query, conn, params=[area, end_date])
-            else:
-                query = '''SELECT datetime, price_eur_per_mwh FROM price_data 
-                          WHERE area_code = ? ORDER BY datetime'''
-                df = pd.read_sql_query(query, conn, params=[area])
+        # Get exchange rate; prices are converted by the query itself
+        currency_rate = CURRENCY_RATES.get(currency, 1.0)
+        where, params = price_range_filter(area, start_date, end_date)
+        
+        if not detail:
+            # Summary only: aggregate in one scan instead of fetching every hour
+            with read_connection() as conn:
+                total_hours, negative_hours, lowest_price, avg_negative_price, first, last = conn.execute(
+                    f'''SELECT COUNT(*), SUM(price < 0), MIN(price),
+                              AVG(CASE WHEN price < 0 THEN price END), MIN(datetime), MAX(datetime)
+                       FROM (SELECT datetime, price_eur_per_mwh * ? AS price FROM price_data WHERE {where})''',
+                    [currency_rate] + params).fetchone()
+            
+            if not total_hours:
+                return jsonify({'error': f'No data found for area {area}'}), 404
                 
-        if df.empty:
+            return safe_jsonify({
+                'area': area,
+                'currency': currency,
+                'total_hours': total_hours,
+                'negative_hours': negative_hours,
+                'date_range': {
+                    'start': first,
+                    'end': last
+                },
+                'statistics': {
+                    'lowest_price': round(lowest_price, 2),
+                    'avg_negative_price': round(avg_negative_price, 2) if negative_hours else None
+                }
+            })
+        
+        with read_connection() as conn:
+            rows = conn.execute(
+                f'SELECT datetime, price_eur_per_mwh * ? AS price FROM price_data WHERE {where} ORDER BY datetime',
+                [currency_rate] + params).fetchall()
+                
+        if not rows:
             return jsonify({'error': f'No data found for area {area}'}), 404
             
-        # Convert datetime to pandas datetime index
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df.set_index('datetime', inplace=True)
-            
-        # Get exchange rate and convert prices
-        currency_rate = CURRENCY_RATES.get(currency, 1.0)
-        df['price_converted'] = df['price_eur_per_mwh'] * currency_rate
+        # Only a timestamp and a price array are needed, so fill them straight
+        # from the rows rather than building a DataFrame
+        datetimes, prices = zip(*rows)
+        timestamps = np.array(datetimes, dtype='datetime64[s]')
+        prices = np.array(prices, dtype=np.float64)
         
         # Find negative price periods
-        negative_mask = df['price_converted'] < 0
+        negative_mask = prices < 0
         negative_periods = []
         
         if negative_mask.any():
-            # Group consecutive negative hours
-            changes = negative_mask.diff().fillna(False)
-            period_starts = df[changes & negative_mask].index
-            period_ends = df[changes & ~negative_mask].index
-            
-            # Handle case where negative period extends to end of data
-            if len(period_starts) > len(period_ends):
-                period_ends = period_ends.append(pd.Index([df.index[-1]]))
-                
-            # Handle case where data starts with negative period
-            if len(period_ends) > len(period_starts):
-                period_starts = pd.Index([df.index[0]]).append(period_starts)
-                
-            for start, end in zip(period_starts, period_ends):
-                period_data = df.loc[start:end]
-                if (period_data['price_converted'] < 0).any():
-                    # Find actual start and end of negative period
-                    neg_data = period_data[period_data['price_converted'] < 0]
-                    if not neg_data.empty:
-                        negative_periods.append({
-                            'start': neg_data.index.min().isoformat(),
-                            'end': neg_data.index.max().isoformat(),
-                            'duration_hours': len(neg_data),
-                            'min_price': round(float(neg_data['price_converted'].min()), 2),
-                            'avg_price': round(float(neg_data['price_converted'].mean()), 2),
-                            'hourly_prices': [
-                                {
-                                    'timestamp': ts.isoformat(),
-                                    'price': round(float(price), 2)
-                                }
-                                for ts, price in neg_data['price_converted'].items()
-                            ]
-                        })
-        
-        return jsonify({
+            # Run-length encode the mask: boundaries alternate between run starts and ends
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], negative_mask.view(np.int8), [0]))))
+            starts, ends = edges[0::2], edges[1::2]
+            lengths = ends - starts
+            # Per-run min and mean in one reduction over the negative prices,
+            # where each run is a contiguous segment
+            run_offsets = np.concatenate(([0], np.cumsum(lengths[:-1])))
+            negative_prices = prices[negative_mask]
+            run_mins = round_floats(np.minimum.reduceat(negative_prices, run_offsets), 2)
+            run_avgs = round_floats(np.add.reduceat(negative_prices, run_offsets) / lengths, 2)
+            run_first = np.datetime_as_string(timestamps[starts]).tolist()
+            run_last = np.datetime_as_string(timestamps[ends - 1]).tolist()
+            # Round once; each period's hourly prices are then views into this array
+            rounded_prices = np.array(round_floats(prices, 2))
+            for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+                negative_periods.append({
+                    'start': run_first[i],
+                    'end': run_last[i],
+                    'duration_hours': end - start,
+                    'min_price': run_mins[i],
+                    'avg_price': run_avgs[i],
+                    # Parallel arrays, serialized directly from NumPy by orjson
+                    'hourly_prices': {
+                        'timestamps': timestamps[start:end],
+                        'prices': rounded_prices[start:end]
+                    }
+                })
+        
+        negative_hours = int(np.count_nonzero(negative_mask))
+        lowest_price, avg_negative_price = round_floats(
+            [prices.min(), prices[negative_mask].mean() if negative_hours else np.nan], 2)
+        return safe_jsonify({
             'area': area,
             'currency': currency,
-            'total_hours': len(df),
-            'negative_hours': int((df['price_converted'] < 0).sum()),
+            'total_hours': len(prices),
+            'negative_hours': negative_hours,
             'date_range': {
-                'start': df.index.min().isoformat() if not df.empty else None,
-                'end': df.index.max().isoformat() if not df.empty else None
+                'start': np.datetime_as_string(timestamps[0]),
+                'end': np.datetime_as_string(timestamps[-1])
             },
             'negative_periods': negative_periods,
             'statistics': {
                 'total_negative_periods': len(negative_periods),
-                'total_negative_hours': sum(p['duration_hours'] for p in negative_periods),
+                'total_negative_hours': negative_hours,
                 'longest_period_hours': max((p['duration_hours'] for p in negative_periods), default=0),
-                'lowest_price': round(float(df['price_converted'].min()), 2) if not df.empty else None,
-                'avg_negative_price': round(float(df[df['price_converted'] < 0]['price_converted'].mean()), 2) if (df['price_converted'] < 0).any() else None
+                'lowest_price': lowest_price,
+                'avg_negative_price': avg_negative_price if negative_hours else None
             }
         })
         
@@ -1520,6 +1775,76 @@ def get_negative_price_periods():
         logger.error(f"Error getting negative price periods: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+# Runs per-area summary queries of a /graph/batch request side by side;
+# WAL mode lets the read-only connections query concurrently
+_graph_batch_executor = ThreadPoolExecutor(max_workers=READ_POOL_SIZE, thread_name_prefix='graph-batch')
+
+def summarize_area_prices(area, start_date, end_date, currency_rate):
+    """Price summary for one area and date range, or None if there is no data."""
+    where, params = price_range_filter(area, start_date, end_date)
+    with read_connection() as conn:
+        total_hours, negative_hours, min_price, max_price, avg_price, avg_negative_price, first, last = conn.execute(
+            f'''SELECT COUNT(*), SUM(price < 0), MIN(price), MAX(price), AVG(price),
+                      AVG(CASE WHEN price < 0 THEN price END), MIN(datetime), MAX(datetime)
+               FROM (SELECT datetime, price_eur_per_mwh * ? AS price FROM price_data WHERE {where})''',
+            [currency_rate] + params).fetchone()
+            
+    if not total_hours:
+        return None
+    return {
+        'total_hours': total_hours,
+        'negative_hours': negative_hours,
+        'date_range': {
+            'start': first,
+            'end': last
+        },
+        'statistics': {
+            'min_price': round(min_price, 2),
+            'max_price': round(max_price, 2),
+            'avg_price': round(avg_price, 2),
+            'avg_negative_price': round(avg_negative_price, 2) if negative_hours else None
+        }
+    }
+
+@internal_api.route('/graph/batch', methods=['GET'])
+@require_internal_access
+@cached_graph_response
+def get_graph_batch():
+    """Get price summaries for several areas in one request."""
+    try:
+        # Get parameters
+        areas = list(dict.fromkeys(a.strip() for a in request.args.get('areas', '').split(',') if a.strip()))
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        currency = request.args.get('currency', 'EUR')
+        # SECURITY: Database path hardcoded for security
+        
+        if not areas:
+            return jsonify({'error': 'At least one area code is required'}), 400
+        if len(areas) > GRAPH_BATCH_MAX_AREAS:
+            return jsonify({'error': f'At most {GRAPH_BATCH_MAX_AREAS} areas per request'}), 400
+            
+        # Get data from database directly
+        if not Path(SECURE_DB_PATH).exists():
+            return jsonify({'error': f'Database not found'}), 404
+            
+        # Get exchange rate; prices are converted by the queries themselves
+        currency_rate = CURRENCY_RATES.get(currency, 1.0)
+        
+        futures = {area: _graph_batch_executor.submit(summarize_area_prices, area, start_date, end_date, currency_rate)
+                   for area in areas}
+        summaries = {area: future.result() for area, future in futures.items()}
+        
+        return safe_jsonify({
+            'currency': currency,
+            'areas': {area: summary if summary is not None else {'error': f'No data found for area {area}'}
+                      for area, summary in summaries.items()}
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting graph batch: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.errorhandler(404)
 def not_found(e):
     """Handle not found error."""
@@ -1534,6 +1859,72 @@ def internal_error(e):
 app.register_blueprint(internal_api)
 
 # Web Routes (Public Interface)
+AI_EXPLANATION_UNAVAILABLE = "AI explanation temporarily unavailable. The analysis data and charts below provide detailed insights into your solar production and electricity market performance."
+
+# Generates AI explanations after the upload request has returned
+_ai_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ai-explain')
+_analysis_cache_file_lock = threading.Lock()
+
+def write_analysis_cache(cache_file, cached_data):
+    """Write a results cache file atomically, so readers never see a partial file. Returns its size."""
+    data = orjson.dumps(cached_data, default=orjson_default, option=ORJSON_OPTIONS)
+    temp_file = cache_file.with_name(cache_file.name + '.tmp')
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+    os.replace(temp_file, cache_file)
+    return len(data)
+
+# Decoded results cache files keyed by session, revalidated against the file's mtime and size
+RESULTS_CACHE_SIZE = 50
+_results_cache = OrderedDict()
+_results_cache_lock = threading.Lock()
+
+def load_analysis_cache(session_id):
+    """Load a session's results cache file, or None if it doesn't exist."""
+    cache_file = Path('data/cache') / f"{session_id}.json"
+    try:
+        stat = cache_file.stat()
+    except FileNotFoundError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    
+    with _results_cache_lock:
+        entry = _results_cache.get(session_id)
+        if entry is not None and entry[0] == stamp:
+            _results_cache.move_to_end(session_id)
+            return entry[1]
+    
+    with open(cache_file, 'rb') as f:
+        cached_data = orjson.loads(f.read())
+    with _results_cache_lock:
+        _results_cache[session_id] = (stamp, cached_data)
+        if len(_results_cache) > RESULTS_CACHE_SIZE:
+            _results_cache.popitem(last=False)
+    return cached_data
+
+def explain_analysis_in_background(cache_file, analysis_id, analysis_json, metadata):
+    """Generate the AI explanation for a cached analysis and store it in the cache file."""
+    try:
+        logger.info("Generating AI explanation of analysis results")
+        ai_explanation = AIExplainer().explain_analysis(analysis_json, metadata)
+        logger.info(f"Generated AI explanation: {len(ai_explanation)} characters")
+    except Exception as e:
+        logger.warning(f"Failed to generate AI explanation: {e}")
+        # Continue without AI explanation - it's not critical for the analysis
+        ai_explanation = AI_EXPLANATION_UNAVAILABLE
+
+    with _analysis_cache_file_lock:
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_data = orjson.loads(f.read())
+            # The session may have uploaded a new analysis in the meantime
+            if cached_data.get('analysis_id') != analysis_id:
+                return
+            cached_data['ai_explanation'] = ai_explanation
+            write_analysis_cache(cache_file, cached_data)
+        except Exception as e:
+            logger.warning(f"Failed to store AI explanation: {e}")
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     """Main web interface with dashboard and upload functionality."""
@@ -1601,8 +1992,8 @@ def index():
         
         try:
             # Create analysis components
-            price_fetcher = PriceFetcher(db_path=SECURE_DB_PATH)
-            analyzer = PriceAnalyzer()
+            price_fetcher = get_price_fetcher()
+            analyzer = _ANALYZER
             file_analyzer = AIFileAnalyzer()
             
             for i, file in enumerate(valid_files):
@@ -1614,8 +2005,9 @@ def index():
                 temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix=file_extension, delete=False)
                 temp_filename = temp_file.name
                 logger.info(f"Created temporary file: {temp_filename}")
-                file.save(temp_filename)
-                temp_file.close()
+                # Copy into the already open file in 1 MiB chunks
+                with temp_file:
+                    shutil.copyfileobj(file.stream, temp_file, UPLOAD_COPY_CHUNK_SIZE)
                 temp_filenames.append(temp_filename)
                 
                 # Use AI to analyze the file and load data
@@ -1664,18 +2056,19 @@ def index():
             
             if start_date:
                 start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
-                if start_date > production_start:
-                    production_df = production_df[production_df.index >= start_date.tz_localize(None)]
             else:
                 start_date = production_start
                 
             if end_date:
                 end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
-                if end_date < production_end:
-                    production_df = production_df[production_df.index <= end_date.tz_localize(None)]
             else:
                 end_date = production_end
             
+            # Clip production data to the period with a label slice on the sorted index
+            if not production_df.index.is_monotonic_increasing:
+                production_df = production_df.sort_index()
+            production_df = production_df.loc[start_date.tz_localize(None):end_date.tz_localize(None)]
+            
             # Get price data with automatic fetching of missing data
             prices_df = price_fetcher.get_price_data(area, start_date, end_date)
             
@@ -1683,8 +2076,10 @@ def index():
             merged_df = analyzer.merge_data(prices_df, production_df, currency_rate)
             analysis = analyzer.analyze_data(merged_df)
             
-            # Convert analysis results to JSON-serializable format using our custom encoder
-            analysis_json = json.loads(json.dumps(analysis, cls=NumpyJSONEncoder))
+            # Encode once with orjson; the bytes go into the cache file as-is and
+            # the decoded copy (native types only) feeds the AI explanation
+            analysis_bytes = orjson.dumps(analysis, default=orjson_default, option=ORJSON_OPTIONS)
+            analysis_json = orjson.loads(analysis_bytes)
             
             # Log email for future use - support multiple files
             try:
@@ -1701,36 +2096,21 @@ def index():
                 'email': email,
                 'area_code': area,
                 'currency': currency,
-                'currency_rate': float(currency_rate),
+                'currency_rate': currency_rate,
                 'file_names': [secure_filename(f['original_filename']) for f in file_analyses],
                 'file_count': len(file_analyses),
                 'ai_analysis': primary_analysis,
                 'start_date': start_date.isoformat(),
                 'end_date': end_date.isoformat(),
-                'data_points': int(len(merged_df))
+                'data_points': len(merged_df)
             }
             
-            # Generate AI explanation of the analysis
-            ai_explanation = None
-            try:
-                logger.info("Generating AI explanation of analysis results")
-                explainer = AIExplainer()
-                ai_explanation = explainer.explain_analysis(analysis_json, metadata)
-                logger.info(f"Generated AI explanation: {len(ai_explanation)} characters")
-            except Exception as e:
-                logger.warning(f"Failed to generate AI explanation: {e}")
-                # Continue without AI explanation - it's not critical for the analysis
-                ai_explanation = "AI explanation temporarily unavailable. The analysis data and charts below provide detailed insights into your solar production and electricity market performance."
-            
             # Store the full analysis (including chart data) using a unique session ID
             session_id = session.get('session_id', None)
             if not session_id:
                 session_id = str(uuid.uuid4())
                 session['session_id'] = session_id
             
-            # Create a session-safe version of analysis (without large time series data)
-            session_analysis = {k: v for k, v in analysis_json.items() if k not in ['time_series', 'daily_series', 'negative_price_timeline']}
-            
             # Store only essential metadata in session
             session['analysis_results'] = {
                 'metadata': metadata,
@@ -1742,20 +2122,27 @@ def index():
             # For now, we'll use a simple file-based cache
             cache_dir = Path('data/cache')
             cache_dir.mkdir(exist_ok=True)
-            cache_file = cache_dir / f"{session_id}.pkl"
-            
-            # Clean up old cache files periodically
-            cleanup_old_cache_files()
-            
-            with open(cache_file, 'wb') as f:
-                pickle.dump({
-                    'analysis': analysis_json,
+            cache_file = cache_dir / f"{session_id}.json"
+            
+            # The AI explanation is filled in by a background task; /results polls for it
+            analysis_id = uuid.uuid4().hex
+            with _analysis_cache_file_lock:
+                cache_size = write_analysis_cache(cache_file, {
+                    'analysis_id': analysis_id,
+                    'analysis': orjson.Fragment(analysis_bytes),
                     'metadata': metadata,
-                    'ai_explanation': ai_explanation,
+                    'ai_explanation': None,
                     'timestamp': datetime.now().isoformat()
-                }, f)
+                })
             
-            logger.info(f"Analysis cached for session {session_id}, size: {len(str(analysis_json))} chars")
+            # Track the file and evict old ones
+            try:
+                record_cache_file(session_id, cache_size)
+            except sqlite3.Error as e:
+                logger.warning(f"Cache manifest update failed: {e}")
+            _ai_executor.submit(explain_analysis_in_background, cache_file, analysis_id, analysis_json, metadata)
+            
+            logger.info(f"Analysis cached for session {session_id}, size: {len(analysis_bytes)} bytes")
             
             flash('Analysis completed successfully!', 'success')
             return redirect('/results')
@@ -1785,41 +2172,79 @@ def get_api_token():
         'header': INTERNAL_API_HEADER
     })
 
+# Rendered /status page, reused for a while as its numbers change at most hourly
+STATUS_CACHE_SECONDS = 60
+_status_page = None  # (host, rendered_at, db_stamp, html, gzip_html)
+
+def render_status_page():
+    """Render the status page from the current database statistics."""
+    # Get database info for status display
+    if Path(SECURE_DB_PATH).exists():
+        with read_connection() as conn:
+            total_records, area_count, first, last = conn.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT area_code), MIN(datetime), MAX(datetime) FROM price_data').fetchone()
+    else:
+        total_records, area_count, first, last = 0, 0, None, None
+        
+    status_data = {
+        'service': 'Sourceful Energy Web Application',
+        'status': 'operational',
+        'database': {
+            'records': total_records,
+            'areas': area_count,
+            'coverage': f"{first} to {last}" if first else "No data"
+        },
+        'features': {
+            'csv_analysis': True,
+            'negative_price_detection': True,
+            'multi_currency': True,
+            'supported_currencies': list(CURRENCY_RATES.keys())
+        }
+    }
+    
+    return render_template('status.html', status=status_data)
+
 @app.route('/status')
 def status():
     """Public status page showing application health and statistics."""
+    global _status_page
     try:
-        # Get database info for status display
-        if Path(SECURE_DB_PATH).exists():
-            with sqlite3.connect(SECURE_DB_PATH) as conn:
-                total_records = conn.execute('SELECT COUNT(*) FROM price_data').fetchone()[0]
-                areas = conn.execute('SELECT DISTINCT area_code FROM price_data ORDER BY area_code').fetchall()
-                date_range = conn.execute('SELECT MIN(datetime), MAX(datetime) FROM price_data').fetchone()
-        else:
-            total_records = 0
-            areas = []
-            date_range = (None, None)
-            
-        status_data = {
-            'service': 'Sourceful Energy Web Application',
-            'status': 'operational',
-            'database': {
-                'records': total_records,
-                'areas': len(areas),
-                'coverage': f"{date_range[0]} to {date_range[1]}" if date_range[0] else "No data"
-            },
-            'features': {
-                'csv_analysis': True,
-                'negative_price_detection': True,
-                'multi_currency': True,
-                'supported_currencies': list(CURRENCY_RATES.keys())
-            }
-        }
-        
-        return render_template('status.html', status=status_data)
+        # The page embeds the request host, so a cached render is only reused for the same host
+        stamp = _price_db_stamp()
+        now = time.monotonic()
+        page = _status_page
+        if (page is None or page[0] != request.host or page[2] != stamp
+                or now - page[1] > STATUS_CACHE_SECONDS):
+            html = render_status_page().encode()
+            page = (request.host, now, stamp, html, gzip.compress(html))
+            _status_page = page
     except Exception as e:
         logger.error(f"Status page error: {e}")
         return render_template('status.html', status={'service': 'Sourceful Energy', 'status': 'error'})
+    
+    if request.accept_encodings['gzip']:
+        response = Response(page[4], content_type='text/html; charset=utf-8')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(page[3], content_type='text/html; charset=utf-8')
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/results/ai-explanation')
+def results_ai_explanation():
+    """Report whether the AI explanation for the session's analysis is ready."""
+    session_id = session.get('session_id')
+    if not session_id:
+        return jsonify({'error': 'Session expired'}), 404
+    
+    cached_data = load_analysis_cache(session_id)
+    if cached_data is None:
+        return jsonify({'error': 'Analysis data expired'}), 404
+    
+    ai_explanation = cached_data.get('ai_explanation', 'AI explanation not available for this analysis.')
+    if ai_explanation is None:
+        return jsonify({'status': 'pending'})
+    return jsonify({'status': 'ready', 'ai_explanation': ai_explanation})
 
 @app.route('/results')
 def results_page():
@@ -1832,16 +2257,15 @@ def results_page():
     session_id = session.get('session_id')
     if session_id:
         try:
-            cache_file = Path('data/cache') / f"{session_id}.pkl"
-            if cache_file.exists():
-                with open(cache_file, 'rb') as f:
-                    cached_data = pickle.load(f)
-                
-                # Use cached data which includes chart time series
+            cached_data = load_analysis_cache(session_id)
+            if cached_data is not None:
+                # Use cached data which includes chart time series; a None
+                # explanation is still being generated in the background
                 results = {
                     'analysis': cached_data['analysis'],
-                    'metadata': cached_data['metadata'],
-                    'ai_explanation': cached_data.get('ai_explanation', 'AI explanation not available for this analysis.')
+                    'metadata': dict(cached_data['metadata']),
+                    'ai_explanation': cached_data.get('ai_explanation', 'AI explanation not available for this analysis.'),
+                    'ai_explanation_pending': cached_data.get('ai_explanation', '') is None
                 }
                 
                 # Add session_id to metadata for download links
@@ -1928,8 +2352,8 @@ def results_page():
         
         try:
             # Create analysis components
-            price_fetcher = PriceFetcher(db_path=SECURE_DB_PATH)
-            analyzer = PriceAnalyzer()
+            price_fetcher = get_price_fetcher()
+            analyzer = _ANALYZER
             file_analyzer = AIFileAnalyzer()
             
             for i, file in enumerate(valid_files):
@@ -1994,18 +2418,19 @@ def results_page():
             
             if start_date:
                 start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
-                if start_date > production_start:
-                    production_df = production_df[production_df.index >= start_date.tz_localize(None)]
             else:
                 start_date = production_start
                 
             if end_date:
                 end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
-                if end_date < production_end:
-                    production_df = production_df[production_df.index <= end_date.tz_localize(None)]
             else:
                 end_date = production_end
             
+            # Clip production data to the period with a label slice on the sorted index
+            if not production_df.index.is_monotonic_increasing:
+                production_df = production_df.sort_index()
+            production_df = production_df.loc[start_date.tz_localize(None):end_date.tz_localize(None)]
+            
             # Get price data with automatic fetching of missing data
             prices_df = price_fetcher.get_price_data(area, start_date, end_date)
             
@@ -2014,7 +2439,7 @@ def results_page():
             analysis = analyzer.analyze_data(merged_df)
             
             # Convert analysis results to JSON-serializable format using our custom encoder
-            analysis_json = json.loads(json.dumps(analysis, cls=NumpyJSONEncoder))
+            analysis_json = orjson.loads(orjson.dumps(analysis, default=orjson_default, option=ORJSON_OPTIONS))
             
             # Log email for future use (simple file logging for now)
             try:
@@ -2069,18 +2494,18 @@ def results_page():
             # For now, we'll use a simple file-based cache
             cache_dir = Path('data/cache')
             cache_dir.mkdir(exist_ok=True)
-            cache_file = cache_dir / f"{session_id}.pkl"
+            cache_file = cache_dir / f"{session_id}.json"
             
             # Clean up old cache files periodically
             cleanup_old_cache_files()
             
             with open(cache_file, 'wb') as f:
-                pickle.dump({
+                f.write(orjson.dumps({
                     'analysis': analysis_json,
                     'metadata': metadata,
                     'ai_explanation': ai_explanation,
                     'timestamp': datetime.now().isoformat()
-                }, f)
+                }, default=orjson_default, option=ORJSON_OPTIONS))
             
             logger.info(f"Analysis cached for session {session_id}, size: {len(str(analysis_json))} chars")
             
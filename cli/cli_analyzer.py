@@ -48,15 +48,20 @@ class AnalysisPipeline:
         # Load production data first to determine date range if not provided
         production_df = self.production_loader.load_production_data(production_file)
         
+        # Sort once so the date limits below can slice by binary search
+        if not production_df.index.is_monotonic_increasing:
+            production_df = production_df.sort_index()
+        
         # Set date range - use full production timeframe by default
         production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
         production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
         
         # Only limit timeframe if explicitly provided
+        lo = hi = None
         if start_date is not None:
             start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
             if start_date > production_start:
-                production_df = production_df[production_df.index >= start_date.tz_localize(None)]
+                lo = start_date.tz_localize(None)
                 logger.info(f"Limiting production data to start from: {start_date.date()}")
         else:
             start_date = production_start
@@ -64,11 +69,14 @@ class AnalysisPipeline:
         if end_date is not None:
             end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
             if end_date < production_end:
-                production_df = production_df[production_df.index <= end_date.tz_localize(None)]
+                hi = end_date.tz_localize(None)
                 logger.info(f"Limiting production data to end at: {end_date.date()}")
         else:
             end_date = production_end
         
+        if lo is not None or hi is not None:
+            production_df = production_df.loc[lo:hi]
+        
         logger.info(f"Analysis period: {start_date.date()} to {end_date.date()}")
         
         # Get price data for the determined timeframe
@@ -86,7 +94,7 @@ class AnalysisPipeline:
         # Save merged data if output file specified
         if output_file:
             logger.info(f"Saving merged data to {output_file}")
-            merged_df.to_csv(output_file)
+            self.analyzer.save_merged_data(merged_df, output_file)
         
         return merged_df, analysis
 
@@ -10,24 +10,36 @@ Usage:
     python db_manager.py --area SE_4 --info               # Show info for specific area
     python db_manager.py --area SE_4 --clear              # Clear data for specific area
     python db_manager.py --export prices_export.csv       # Export all data to CSV
+    python db_manager.py --compact                        # Compact finished years to Parquet
 """
 
 import argparse
 import pandas as pd
+import shutil
 import sqlite3
+from contextlib import closing, contextmanager
 from pathlib import Path
 
 class PriceDatabaseManager:
     def __init__(self, db_path='price_data.db'):
         self.db_path = db_path
     
+    @contextmanager
+    def _read_connection(self):
+        """Open a read-only connection for reporting, closed afterwards."""
+        with closing(sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)) as conn:
+            conn.execute('PRAGMA query_only=1')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA mmap_size=268435456')  # 256MB memory map
+            yield conn
+    
     def show_database_info(self):
         """Show general database information."""
         if not Path(self.db_path).exists():
             print(f"Database {self.db_path} does not exist.")
             return
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             # Get total records
             total_records = conn.execute('SELECT COUNT(*) FROM price_data').fetchone()[0]
             
@@ -61,7 +73,7 @@ class PriceDatabaseManager:
             print(f"Database {self.db_path} does not exist.")
             return
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             areas = conn.execute('SELECT DISTINCT area_code FROM price_data ORDER BY area_code').fetchall()
             
         if areas:
@@ -77,7 +89,7 @@ class PriceDatabaseManager:
             print(f"Database {self.db_path} does not exist.")
             return
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             # Check if area exists
             count = conn.execute('SELECT COUNT(*) FROM price_data WHERE area_code = ?', (area_code,)).fetchone()[0]
             
@@ -150,6 +162,10 @@ class PriceDatabaseManager:
             # Delete data
             conn.execute('DELETE FROM price_data WHERE area_code = ?', (area_code,))
             print(f"Deleted {count:,} records for area {area_code}")
+        
+        # Compacted Parquet shards would otherwise keep serving the deleted data
+        from core.price_fetcher import parquet_cache_dir
+        shutil.rmtree(parquet_cache_dir(self.db_path) / area_code, ignore_errors=True)
     
     def export_data(self, output_file, area_code=None):
         """Export data to CSV file."""
@@ -157,7 +173,7 @@ class PriceDatabaseManager:
             print(f"Database {self.db_path} does not exist.")
             return
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read_connection() as conn:
             if area_code:
                 query = 'SELECT * FROM price_data WHERE area_code = ? ORDER BY area_code, datetime'
                 params = (area_code,)
@@ -176,6 +192,28 @@ class PriceDatabaseManager:
         df.to_csv(output_file, index=False)
         print(f"Exported {len(df):,} records to {output_file}")
 
+    def compact_to_parquet(self, area_code=None):
+        """Compact finished years into Parquet shards for faster long-range reads."""
+        if not Path(self.db_path).exists():
+            print(f"Database {self.db_path} does not exist.")
+            return
+        
+        from core.price_fetcher import PriceDatabase
+        db = PriceDatabase(self.db_path)
+        
+        if area_code:
+            areas = [area_code]
+        else:
+            with self._read_connection() as conn:
+                areas = [row[0] for row in conn.execute('SELECT DISTINCT area_code FROM price_data ORDER BY area_code')]
+        
+        for area in areas:
+            years = db.flush_to_parquet(area)
+            if years:
+                print(f"{area}: compacted {', '.join(map(str, years))}")
+            else:
+                print(f"{area}: nothing to compact")
+
 def main():
     parser = argparse.ArgumentParser(description='Manage the price database')
     parser.add_argument('--db-path', default='price_data.db', help='Path to the database file')
@@ -184,6 +222,7 @@ def main():
     parser.add_argument('--area', help='Specific area to operate on')
     parser.add_argument('--clear', action='store_true', help='Clear data for specified area')
     parser.add_argument('--export', help='Export data to CSV file')
+    parser.add_argument('--compact', action='store_true', help='Compact finished years to Parquet (all areas, or --area)')
     parser.add_argument('--eur-sek-rate', type=float, default=11.5, help='EUR to SEK exchange rate for display (default: 11.5)')
     
     args = parser.parse_args()
@@ -201,6 +240,8 @@ def main():
         manager.clear_area_data(args.area)
     elif args.export:
         manager.export_data(args.export, args.area)
+    elif args.compact:
+        manager.compact_to_parquet(args.area)
     else:
         parser.print_help()
 
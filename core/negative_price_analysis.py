@@ -59,7 +59,7 @@ def analyze_negative_pricing(csv_file):
         'production_kwh': 'sum',
         'export_value_sek': 'sum'
     })
-    monthly['cost_sek'] = abs(monthly['export_value_sek'])
+    monthly['cost_sek'] = monthly['export_value_sek'].abs()
     monthly = monthly[monthly['production_kwh'] > 0]  # Only months with production during negative prices
     
     for month, row in monthly.iterrows():
@@ -78,7 +78,7 @@ def analyze_negative_pricing(csv_file):
         'production_kwh': 'sum',
         'export_value_sek': 'sum'
     })
-    daily_costs['cost_sek'] = abs(daily_costs['export_value_sek'])
+    daily_costs['cost_sek'] = daily_costs['export_value_sek'].abs()
     daily_costs = daily_costs[daily_costs['production_kwh'] > 0]
     
     print(f"  Number of days with negative export costs: {len(daily_costs)}")
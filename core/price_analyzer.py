@@ -6,6 +6,7 @@ Core analysis logic for electricity prices and solar production data.
 Handles data merging, calculations, and statistical analysis.
 """
 
+import numpy as np
 import pandas as pd
 import logging
 from typing import Dict, Any
@@ -36,16 +37,23 @@ class PriceAnalyzer:
         # Merge on datetime index
         merged_df = pd.merge(prices_df, production_df, left_index=True, right_index=True, how='inner')
         
+        # Hourly arithmetic on the underlying arrays, skipping Series alignment
+        price_eur = merged_df['price_eur_per_mwh'].to_numpy(dtype='float64')
+        production = merged_df['production_kwh'].to_numpy(dtype='float64')
+        
         # Add SEK pricing (convert from EUR/MWh to SEK/kWh)
-        merged_df['price_sek_per_kwh'] = (merged_df['price_eur_per_mwh'] * eur_sek_rate) / 1000
+        price_sek = (price_eur * eur_sek_rate) / 1000
+        merged_df['price_sek_per_kwh'] = price_sek
         
         # Calculate export value/cost for each hour
-        merged_df['export_value_sek'] = merged_df['production_kwh'] * merged_df['price_sek_per_kwh']
+        merged_df['export_value_sek'] = production * price_sek
         
-        # Add daily aggregations
-        merged_df['production_daily'] = merged_df.groupby(merged_df.index.date)['production_kwh'].transform('sum')
-        merged_df['price_daily_avg'] = merged_df.groupby(merged_df.index.date)['price_eur_per_mwh'].transform('mean')
-        merged_df['export_value_daily_sek'] = merged_df.groupby(merged_df.index.date)['export_value_sek'].transform('sum')
+        # Add daily aggregations; grouping on the floored index stays in int64 arithmetic
+        # instead of creating a datetime.date object per row
+        by_day = merged_df.groupby(merged_df.index.floor('D'))
+        merged_df['production_daily'] = by_day['production_kwh'].transform('sum')
+        merged_df['price_daily_avg'] = by_day['price_eur_per_mwh'].transform('mean')
+        merged_df['export_value_daily_sek'] = by_day['export_value_sek'].transform('sum')
         
         logger.info(f"Merged data: {len(merged_df)} rows from {merged_df.index.min()} to {merged_df.index.max()}")
         
@@ -82,71 +90,81 @@ class PriceAnalyzer:
         }
         
         # Daily aggregations for monthly/weekly views
-        daily_data = merged_df.groupby(merged_df.index.date).agg({
+        daily_data = merged_df.groupby(merged_df.index.floor('D')).agg({
             'production_kwh': 'sum',
             'price_eur_per_mwh': 'mean',
             'export_value_sek': 'sum'
-        }).reset_index()
+        })
         
         analysis['daily_series'] = {
-            'dates': [d.isoformat() for d in daily_data['index']],
+            'dates': daily_data.index.strftime('%Y-%m-%d').tolist(),
             'daily_production': daily_data['production_kwh'].tolist(),
             'daily_avg_price': daily_data['price_eur_per_mwh'].tolist(),
             'daily_export_value': daily_data['export_value_sek'].tolist()
         }
         
-        # Negative pricing insights
-        negative_periods = merged_df[merged_df['price_eur_per_mwh'] < 0]
-        if len(negative_periods) > 0:
+        # Column arrays for the scalar statistics; NaN-aware reductions match pandas' skipna
+        price_eur = merged_df['price_eur_per_mwh'].to_numpy(dtype='float64')
+        price_sek = merged_df['price_sek_per_kwh'].to_numpy(dtype='float64')
+        production = merged_df['production_kwh'].to_numpy(dtype='float64')
+        export_value = merged_df['export_value_sek'].to_numpy(dtype='float64')
+        negative_mask = price_eur < 0
+        
+        # Negative pricing insights, from the masked arrays rather than a DataFrame slice
+        negative_index = merged_df.index[negative_mask]
+        negative_production = production[negative_mask]
+        negative_export = export_value[negative_mask]
+        negative_count = len(negative_index)
+        if negative_count > 0:
             analysis['negative_price_timeline'] = {
-                'timestamps': [dt.isoformat() for dt in negative_periods.index],
-                'production_kwh': negative_periods['production_kwh'].tolist(),
-                'prices_eur_mwh': negative_periods['price_eur_per_mwh'].tolist(),
-                'cost_sek': negative_periods['export_value_sek'].tolist()
+                'timestamps': np.datetime_as_string(negative_index.values, unit='s').tolist(),
+                'production_kwh': negative_production.tolist(),
+                'prices_eur_mwh': price_eur[negative_mask].tolist(),
+                'cost_sek': negative_export.tolist()
             }
         else:
             analysis['negative_price_timeline'] = None
         
         # Price statistics in SEK/kWh (user-friendly format)
-        analysis['price_min_sek_kwh'] = merged_df['price_sek_per_kwh'].min()
-        analysis['price_max_sek_kwh'] = merged_df['price_sek_per_kwh'].max()
-        analysis['price_mean_sek_kwh'] = merged_df['price_sek_per_kwh'].mean()
-        analysis['price_median_sek_kwh'] = merged_df['price_sek_per_kwh'].median()
+        analysis['price_min_sek_kwh'] = np.nanmin(price_sek)
+        analysis['price_max_sek_kwh'] = np.nanmax(price_sek)
+        analysis['price_mean_sek_kwh'] = np.nanmean(price_sek)
+        analysis['price_median_sek_kwh'] = np.nanmedian(price_sek)
         
         # Keep EUR/MWh for reference (internal use)
-        analysis['price_min_eur_mwh'] = merged_df['price_eur_per_mwh'].min()
-        analysis['price_max_eur_mwh'] = merged_df['price_eur_per_mwh'].max()
-        analysis['price_mean_eur_mwh'] = merged_df['price_eur_per_mwh'].mean()
-        analysis['price_median_eur_mwh'] = merged_df['price_eur_per_mwh'].median()
+        analysis['price_min_eur_mwh'] = np.nanmin(price_eur)
+        analysis['price_max_eur_mwh'] = np.nanmax(price_eur)
+        analysis['price_mean_eur_mwh'] = np.nanmean(price_eur)
+        analysis['price_median_eur_mwh'] = np.nanmedian(price_eur)
         
         # Production statistics
-        analysis['production_total'] = merged_df['production_kwh'].sum()
-        analysis['production_mean'] = merged_df['production_kwh'].mean()
-        analysis['production_max'] = merged_df['production_kwh'].max()
-        analysis['hours_with_production'] = (merged_df['production_kwh'] > 0).sum()
+        analysis['production_total'] = np.nansum(production)
+        analysis['production_mean'] = np.nanmean(production)
+        analysis['production_max'] = np.nanmax(production)
+        analysis['hours_with_production'] = np.count_nonzero(production > 0)
         
         # Negative price analysis (Enhanced)
-        negative_prices = merged_df[merged_df['price_eur_per_mwh'] < 0]
-        analysis['negative_price_hours'] = len(negative_prices)
-        analysis['production_during_negative_prices'] = negative_prices['production_kwh'].sum()
-        analysis['negative_export_cost_sek'] = negative_prices['export_value_sek'].sum()  # This will be negative
-        analysis['negative_export_cost_abs_sek'] = abs(negative_prices['export_value_sek'].sum())  # Absolute cost
+        analysis['negative_price_hours'] = negative_count
+        analysis['production_during_negative_prices'] = np.nansum(negative_production)
+        analysis['negative_export_cost_sek'] = np.nansum(negative_export)  # This will be negative
+        analysis['negative_export_cost_abs_sek'] = abs(analysis['negative_export_cost_sek'])  # Absolute cost
         
         # Enhanced negative pricing metrics
-        analysis['negative_price_percentage'] = (len(negative_prices) / len(merged_df)) * 100 if len(merged_df) > 0 else 0
+        analysis['negative_price_percentage'] = (negative_count / len(merged_df)) * 100 if len(merged_df) > 0 else 0
         analysis['production_percentage_negative_prices'] = (analysis['production_during_negative_prices'] / analysis['production_total']) * 100 if analysis['production_total'] > 0 else 0
         
-        if len(negative_prices) > 0:
-            analysis['avg_production_during_negative_prices'] = negative_prices['production_kwh'].mean()
-            analysis['avg_negative_price_sek_per_kwh'] = negative_prices['price_sek_per_kwh'].mean()
-            analysis['min_negative_price_sek_per_kwh'] = negative_prices['price_sek_per_kwh'].min()
+        if negative_count > 0:
+            negative_price_sek = price_sek[negative_mask]
+            analysis['avg_production_during_negative_prices'] = np.nanmean(negative_production)
+            analysis['avg_negative_price_sek_per_kwh'] = np.nanmean(negative_price_sek)
+            analysis['min_negative_price_sek_per_kwh'] = np.nanmin(negative_price_sek)
             
             # Find the worst negative price period
-            worst_negative_idx = negative_prices['price_eur_per_mwh'].idxmin()
-            analysis['worst_negative_price_datetime'] = worst_negative_idx.isoformat()
-            analysis['worst_negative_price_eur_mwh'] = negative_prices.loc[worst_negative_idx, 'price_eur_per_mwh']
-            analysis['worst_negative_price_production'] = negative_prices.loc[worst_negative_idx, 'production_kwh']
-            analysis['worst_negative_price_cost'] = abs(negative_prices.loc[worst_negative_idx, 'export_value_sek'])
+            worst = np.argmin(price_eur[negative_mask])
+            analysis['worst_negative_price_datetime'] = negative_index[worst].isoformat()
+            analysis['worst_negative_price_eur_mwh'] = price_eur[negative_mask][worst]
+            analysis['worst_negative_price_production'] = negative_production[worst]
+            analysis['worst_negative_price_cost'] = abs(negative_export[worst])
         else:
             analysis['avg_production_during_negative_prices'] = 0
             analysis['avg_negative_price_sek_per_kwh'] = 0
@@ -157,20 +175,22 @@ class PriceAnalyzer:
             analysis['worst_negative_price_cost'] = 0
         
         # Total export value
-        analysis['total_export_value_sek'] = merged_df['export_value_sek'].sum()
-        analysis['positive_export_value_sek'] = merged_df[merged_df['price_eur_per_mwh'] > 0]['export_value_sek'].sum()
+        analysis['total_export_value_sek'] = np.nansum(export_value)
+        analysis['positive_export_value_sek'] = np.nansum(export_value[price_eur > 0])
         
-        # Correlation analysis
-        if merged_df['production_kwh'].var() > 0 and merged_df['price_sek_per_kwh'].var() > 0:
-            analysis['price_production_correlation'] = merged_df['production_kwh'].corr(merged_df['price_sek_per_kwh'])
+        # Correlation analysis, over the hours where both values are present (as pandas' corr)
+        if np.nanvar(production) > 0 and np.nanvar(price_sek) > 0:
+            valid = ~(np.isnan(production) | np.isnan(price_sek))
+            analysis['price_production_correlation'] = np.corrcoef(production[valid], price_sek[valid])[0, 1]
         else:
             analysis['price_production_correlation'] = 0
         
         # Volatility metrics
-        analysis['price_volatility_std'] = merged_df['price_sek_per_kwh'].std()
+        analysis['price_volatility_std'] = np.nanstd(price_sek, ddof=1)
         analysis['price_volatility_cv'] = analysis['price_volatility_std'] / analysis['price_mean_sek_kwh'] if analysis['price_mean_sek_kwh'] != 0 else 0
         
-        return analysis
+        # Hand back native Python scalars so callers can format them directly
+        return {key: value.item() if isinstance(value, np.generic) else value for key, value in analysis.items()}
     
     @staticmethod
     def print_analysis(analysis: Dict[str, Any]):
@@ -227,9 +247,9 @@ class PriceAnalyzer:
             merged_df (pd.DataFrame): Merged hourly data
             
         Returns:
-            pd.DataFrame: Daily summary with aggregated metrics
+            pd.DataFrame: Daily summary with aggregated metrics, indexed by day start
         """
-        daily_summary = merged_df.groupby(merged_df.index.date).agg({
+        daily_summary = merged_df.groupby(merged_df.index.floor('D').rename('date')).agg({
             'production_kwh': ['sum', 'mean', 'max'],
             'price_eur_per_mwh': ['mean', 'min', 'max'],
             'price_sek_per_kwh': ['mean', 'min', 'max'],
@@ -240,3 +260,28 @@ class PriceAnalyzer:
         daily_summary.columns = ['_'.join(col).strip() for col in daily_summary.columns]
         
         return daily_summary
+    
+    @staticmethod
+    def save_merged_data(merged_df: pd.DataFrame, output_file: str):
+        """
+        Write merged data to CSV.
+        
+        Uses Arrow's C++ CSV writer when pyarrow is available and falls back to pandas.
+        
+        Args:
+            merged_df (pd.DataFrame): Merged hourly data
+            output_file (str): Output file path
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+        except ImportError:
+            merged_df.to_csv(output_file)
+            return
+        
+        table = pa.Table.from_pandas(merged_df.reset_index(), preserve_index=False)
+        # Whole-second timestamps, so they are written like pandas does ("2024-01-01 00:00:00")
+        columns = [column.cast(pa.timestamp('s', column.type.tz), safe=False) if pa.types.is_timestamp(column.type) else column
+                   for column in table.columns]
+        table = pa.Table.from_arrays(columns, names=table.column_names)
+        pa_csv.write_csv(table, output_file, write_options=pa_csv.WriteOptions(quoting_header='none'))
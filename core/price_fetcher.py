@@ -5,13 +5,21 @@ Price Data Fetcher
 Handles ENTSO-E API integration and database caching for electricity price data.
 """
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import sqlite3
+import threading
+import functools
+import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, List
-from entsoe import EntsoePandasClient
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -21,6 +29,44 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Format of price_data.datetime, as written by store_data (naive isoformat)
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Concurrent ENTSO-E requests when several periods are missing
+DOWNLOAD_WORKERS = 4
+
+# Spacing of consecutive hourly prices
+_ONE_HOUR = np.timedelta64(1, 'h')
+
+
+def _as_naive(ts) -> pd.Timestamp:
+    """Return ts as a naive local Timestamp, skipping conversions it doesn't need."""
+    if not isinstance(ts, pd.Timestamp):
+        ts = pd.Timestamp(ts)
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
+
+
+@functools.lru_cache(maxsize=32)
+def _hourly_index(year: int) -> pd.DatetimeIndex:
+    """Every local wall-clock hour of a year, without the hour skipped when clocks go forward."""
+    hours = pd.date_range(f'{year}-01-01', f'{year + 1}-01-01', freq='h', inclusive='left')
+    localized = hours.tz_localize('Europe/Stockholm', nonexistent='NaT', ambiguous=np.ones(len(hours), dtype=bool))
+    return hours[localized.notna()]
+
+
+def _collapse_runs(values: np.ndarray, step) -> np.ndarray:
+    """Collapse sorted values into a (K, 2) array of [first, last] for each run spaced exactly step apart."""
+    breaks = np.flatnonzero(np.diff(values) != step) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(values)])) - 1
+    return np.column_stack((values[starts], values[ends]))
+
+
+def parquet_cache_dir(db_path) -> Path:
+    """Directory holding the per-area, per-year Parquet shards of a price database."""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}_parquet")
+
 
 class PriceDatabase:
     """Handles SQLite database operations for price data caching."""
@@ -28,95 +74,300 @@ class PriceDatabase:
     def __init__(self, db_path='price_data.db'):
         """Initialize the price database."""
         self.db_path = db_path
+        self.parquet_dir = parquet_cache_dir(db_path)
+        # area_code -> (stamp, get_data_range result), dropped whenever store_data writes
+        # the area and ignored once the database changes underneath (other connections)
+        self._range_cache = {}
+        # area_code -> (start, end, stamp) last found to have no missing hours; only
+        # trusted while the database stamp is unchanged, since rows can be deleted
+        # (db_manager --clear-area) or written by other processes
+        self._complete_ranges = {}
+        self._conn = None
+        self._lock = threading.Lock()
         self._init_database()
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open the tuned connection kept for the lifetime of this object."""
+        # Shared between threads; every use goes through _connect, which holds self._lock
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Per-connection settings; journal_mode=WAL is persistent and set in _init_database
+        conn.execute('PRAGMA synchronous=NORMAL')  # durable enough under WAL, far fewer fsyncs
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')  # 64MB page cache
+        conn.execute('PRAGMA mmap_size=268435456')  # 256MB memory map
+        return conn
+    
+    @contextmanager
+    def _connect(self):
+        """Use the persistent connection, committing on success; one caller at a time."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._open_connection()
+            with self._conn:
+                yield self._conn
+    
+    def close(self):
+        """Close the persistent connection; it is reopened on next use."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute('PRAGMA optimize')
+                self._conn.close()
+                self._conn = None
+    
+    # Clustered on the primary key: range scans read prices straight from the
+    # table b-tree, with no rowid table or separate key index stored alongside
+    _PRICE_TABLE_SQL = '''
+        CREATE TABLE IF NOT EXISTS {name} (
+            area_code TEXT NOT NULL,
+            datetime TEXT NOT NULL,
+            price_eur_per_mwh REAL NOT NULL,
+            PRIMARY KEY (area_code, datetime)
+        ) WITHOUT ROWID
+    '''
+    
     def _init_database(self):
         """Initialize the database tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS price_data (
-                    area_code TEXT NOT NULL,
-                    datetime TEXT NOT NULL,
-                    price_eur_per_mwh REAL NOT NULL,
-                    PRIMARY KEY (area_code, datetime)
-                )
-            ''')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_area_datetime ON price_data(area_code, datetime)')
+        with self._connect() as conn:
+            # Readers (the web app) don't block on the writer and vice versa
+            conn.execute('PRAGMA journal_mode=WAL')
+            
+            table_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'price_data'").fetchone()
+            if table_sql is not None and 'WITHOUT ROWID' not in table_sql[0].upper():
+                # One-time rebuild of a rowid table created by an earlier version
+                logger.info("Rebuilding price_data as a WITHOUT ROWID table")
+                # sqlite3 only opens transactions implicitly before DML, so the CREATE
+                # would otherwise commit on its own; begin explicitly so a failure
+                # anywhere in the rebuild leaves the original table untouched
+                conn.execute('BEGIN')
+                conn.execute(self._PRICE_TABLE_SQL.format(name='price_data_new'))
+                conn.execute('INSERT INTO price_data_new SELECT area_code, datetime, price_eur_per_mwh FROM price_data')
+                conn.execute('DROP TABLE price_data')
+                conn.execute('ALTER TABLE price_data_new RENAME TO price_data')
+            else:
+                conn.execute(self._PRICE_TABLE_SQL.format(name='price_data'))
+            
+            # Superseded by the clustered primary key
+            conn.execute('DROP INDEX IF EXISTS idx_area_datetime')
+            conn.execute('DROP INDEX IF EXISTS idx_area_datetime_price')
     
     def get_data_range(self, area_code: str) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp], int]:
         """Get the available date range for an area."""
-        with sqlite3.connect(self.db_path) as conn:
+        stamp = self._db_stamp()
+        cached = self._range_cache.get(area_code)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        with self._connect() as conn:
             query = '''
                 SELECT MIN(datetime) as min_date, MAX(datetime) as max_date, COUNT(*) as count
                 FROM price_data 
                 WHERE area_code = ?
             '''
             result = conn.execute(query, (area_code,)).fetchone()
-            if result[0] is None:
-                return None, None, 0
-            return pd.to_datetime(result[0]), pd.to_datetime(result[1]), result[2]
+        if result[0] is None:
+            data_range = (None, None, 0)
+        else:
+            data_range = (pd.Timestamp(result[0]), pd.Timestamp(result[1]), result[2])
+        self._range_cache[area_code] = (stamp, data_range)
+        return data_range
+    
+    def _db_stamp(self) -> Tuple[Optional[int], Optional[int]]:
+        """Modification stamp of the database file and its WAL, covering writes from any connection."""
+        stamp = []
+        for suffix in ('', '-wal'):
+            try:
+                stamp.append(os.stat(f"{self.db_path}{suffix}").st_mtime_ns)
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
     
     def get_missing_periods(self, area_code: str, start_date: pd.Timestamp, end_date: pd.Timestamp) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
-        """Identify periods that need to be downloaded."""
-        min_date, max_date, count = self.get_data_range(area_code)
+        """Identify periods that need to be downloaded, including gaps inside the stored range."""
+        requested_start = _as_naive(start_date)
+        requested_end = _as_naive(end_date)
+        if requested_start > requested_end:
+            # Nothing to download; callers report the empty range themselves
+            return []
+        # Taken before the scan, so a write racing with it invalidates the result
+        stamp = self._db_stamp()
         
-        requested_start = pd.to_datetime(start_date).tz_localize(None)
-        requested_end = pd.to_datetime(end_date).tz_localize(None)
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT datetime FROM price_data WHERE area_code = ? AND datetime BETWEEN ? AND ?',
+                (area_code, requested_start.isoformat(), requested_end.isoformat())).fetchall()
+        existing = pd.DatetimeIndex(np.array([row[0] for row in rows], dtype='datetime64[s]'))
         
-        missing_periods = []
+        # Every local wall-clock hour in the range, from the cached per-year indexes; the
+        # hour skipped when clocks go forward never has data, so it is not expected either
+        years = [_hourly_index(year) for year in range(requested_start.year, requested_end.year + 1)]
+        expected = years[0].append(years[1:]) if len(years) > 1 else years[0]
+        expected = expected[expected.slice_indexer(requested_start, requested_end)]
         
-        if min_date is None:
-            # No data at all
-            missing_periods.append((requested_start, requested_end))
-        else:
-            # Check if we need data before our earliest date
-            if requested_start < min_date:
-                missing_periods.append((requested_start, min(min_date - pd.Timedelta(hours=1), requested_end)))
-            
-            # Check if we need data after our latest date
-            if requested_end > max_date:
-                missing_periods.append((max(max_date + pd.Timedelta(hours=1), requested_start), requested_end))
+        missing = expected.difference(existing)
+        if missing.empty:
+            self._mark_complete(area_code, requested_start, requested_end, stamp)
+            return []
         
-        return missing_periods
+        # Collapse consecutive missing hours into (start, end) periods
+        runs = _collapse_runs(missing.values, _ONE_HOUR)
+        return list(zip(pd.DatetimeIndex(runs[:, 0]), pd.DatetimeIndex(runs[:, 1])))
+    
+    def _mark_complete(self, area_code: str, start: pd.Timestamp, end: pd.Timestamp, stamp):
+        known = self._complete_ranges.get(area_code)
+        if known is not None and known[2] == stamp and known[0] <= end and start <= known[1]:
+            # Overlapping ranges verified against the same database state merge into one
+            start, end = min(start, known[0]), max(end, known[1])
+        self._complete_ranges[area_code] = (start, end, stamp)
     
-    def store_data(self, area_code: str, price_data: pd.Series):
-        """Store price data in the database."""
+    def is_range_complete(self, area_code: str, start_date: pd.Timestamp, end_date: pd.Timestamp) -> bool:
+        """Whether get_missing_periods found no gaps covering this range, with the database unchanged since."""
+        known = self._complete_ranges.get(area_code)
+        if known is None or known[2] != self._db_stamp():
+            return False
+        return known[0] <= _as_naive(start_date) and _as_naive(end_date) <= known[1]
+    
+    def store_data(self, area_code: str, price_data: pd.Series, overwrite: bool = False):
+        """
+        Store price data in the database.
+        
+        Rows already stored for a timestamp are kept unless overwrite is set, in which
+        case the new price replaces them (for late corrections from ENTSO-E).
+        """
         logger.info(f"Storing {len(price_data)} price records for {area_code}")
         
-        # Prepare data for insertion
-        records = []
-        for timestamp, price in price_data.items():
-            # Ensure timezone-naive timestamp
-            if hasattr(timestamp, 'tz') and timestamp.tz is not None:
-                timestamp = timestamp.tz_localize(None)
-            records.append((area_code, timestamp.isoformat(), float(price)))
+        # Prepare data for insertion column-wise, with timezone-naive timestamps
+        index = price_data.index
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        records = zip(itertools.repeat(area_code), index.strftime(DATETIME_FORMAT), price_data.to_numpy(dtype='float64').tolist())
         
-        with sqlite3.connect(self.db_path) as conn:
+        # Published prices don't change, so by default an existing row is left untouched
+        # instead of being deleted and re-inserted
+        if overwrite:
+            on_conflict = 'DO UPDATE SET price_eur_per_mwh = excluded.price_eur_per_mwh'
+        else:
+            on_conflict = 'DO NOTHING'
+        
+        # The connection context commits all rows in one transaction
+        with self._connect() as conn:
             conn.executemany(
-                'INSERT OR REPLACE INTO price_data (area_code, datetime, price_eur_per_mwh) VALUES (?, ?, ?)',
+                'INSERT INTO price_data (area_code, datetime, price_eur_per_mwh) VALUES (?, ?, ?) '
+                f'ON CONFLICT (area_code, datetime) {on_conflict}',
                 records
             )
+            # Refresh planner statistics if this write made them stale
+            conn.execute('PRAGMA optimize')
+        self._range_cache.pop(area_code, None)
+        
+        # Compacted shards for the written years are stale now; SQLite serves them until the next flush
+        if self.parquet_dir.exists():
+            for year in np.unique(index.year):
+                self._parquet_path(area_code, int(year)).unlink(missing_ok=True)
     
     def query_data(self, area_code: str, start_date: pd.Timestamp, end_date: pd.Timestamp) -> pd.DataFrame:
         """Query price data for a specific period."""
-        start_str = pd.to_datetime(start_date).tz_localize(None).isoformat()
-        end_str = pd.to_datetime(end_date).tz_localize(None).isoformat()
+        start = _as_naive(start_date)
+        end = _as_naive(end_date)
         
-        with sqlite3.connect(self.db_path) as conn:
-            query = '''
-                SELECT datetime, price_eur_per_mwh 
-                FROM price_data 
-                WHERE area_code = ? AND datetime >= ? AND datetime <= ?
-                ORDER BY datetime
-            '''
-            df = pd.read_sql_query(query, conn, params=(area_code, start_str, end_str))
-            
-        if len(df) == 0:
+        # Years compacted by flush_to_parquet are read from their shards; the years
+        # in between are read from SQLite, one query per contiguous run
+        pieces = []
+        with self._connect() as conn:
+            pending_start = None
+            for year in range(start.year, end.year + 1):
+                year_start = max(start, pd.Timestamp(year, 1, 1))
+                year_end = min(end, pd.Timestamp(year, 12, 31, 23, 59, 59))
+                shard = self._read_parquet_shard(area_code, year, year_start, year_end)
+                if shard is None:
+                    if pending_start is None:
+                        pending_start = year_start
+                    pending_end = year_end
+                    continue
+                if pending_start is not None:
+                    pieces.append(self._read_rows(conn, area_code, pending_start, pending_end))
+                    pending_start = None
+                pieces.append(shard)
+            if pending_start is not None:
+                pieces.append(self._read_rows(conn, area_code, pending_start, pending_end))
+        
+        pieces = [piece for piece in pieces if len(piece[0])]
+        if not pieces:
             return pd.DataFrame(columns=['price_eur_per_mwh'])
+        if len(pieces) == 1:
+            datetimes, prices = pieces[0]
+        else:
+            datetimes = np.concatenate([piece[0] for piece in pieces])
+            prices = np.concatenate([piece[1] for piece in pieces])
+        
+        index = pd.DatetimeIndex(datetimes, name='datetime')
+        return pd.DataFrame({'price_eur_per_mwh': prices}, index=index)
+    
+    def _read_rows(self, conn, area_code: str, start: pd.Timestamp, end: pd.Timestamp) -> Tuple[np.ndarray, np.ndarray]:
+        """Read datetimes and prices for a period from SQLite as NumPy arrays."""
+        query = '''
+            SELECT datetime, price_eur_per_mwh 
+            FROM price_data 
+            WHERE area_code = ? AND datetime >= ? AND datetime <= ?
+            ORDER BY datetime
+        '''
+        rows = conn.execute(query, (area_code, start.isoformat(), end.isoformat())).fetchall()
+        if not rows:
+            return np.array([], dtype='datetime64[s]'), np.array([], dtype=np.float64)
+        
+        # NumPy parses the ISO datetime strings in C, with no per-value pandas inference
+        datetimes, prices = zip(*rows)
+        return np.array(datetimes, dtype='datetime64[s]'), np.array(prices, dtype=np.float64)
+    
+    def _parquet_path(self, area_code: str, year: int) -> Path:
+        return self.parquet_dir / area_code / f"{year}.parquet"
+    
+    def _read_parquet_shard(self, area_code: str, year: int, start: pd.Timestamp, end: pd.Timestamp) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Read a period from a compacted year shard, or return None if the year isn't compacted."""
+        path = self._parquet_path(area_code, year)
+        try:
+            table = pq.read_table(path, filters=[('datetime', '>=', start.to_datetime64()),
+                                                 ('datetime', '<=', end.to_datetime64())])
+        except (FileNotFoundError, OSError):
+            # Not compacted, or dropped by store_data since the check
+            return None
+        return (table.column('datetime').to_numpy().astype('datetime64[s]'),
+                table.column('price_eur_per_mwh').to_numpy().astype(np.float64))
+    
+    def flush_to_parquet(self, area_code: str) -> List[int]:
+        """
+        Compact the finished years of an area into zstd-compressed Parquet shards.
         
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df = df.set_index('datetime')
-        return df
+        SQLite stays the source of truth: shards are only written for years before the
+        current one, and store_data drops a shard again when it writes into its year.
+        
+        Returns:
+            List[int]: Years written in this call
+        """
+        current_year = pd.Timestamp.now().year
+        written = []
+        with self._connect() as conn:
+            years = [int(year) for (year,) in conn.execute(
+                'SELECT DISTINCT substr(datetime, 1, 4) FROM price_data WHERE area_code = ?', (area_code,))]
+            
+            for year in sorted(years):
+                path = self._parquet_path(area_code, year)
+                if year >= current_year or path.exists():
+                    continue
+                
+                datetimes, prices = self._read_rows(conn, area_code, pd.Timestamp(year, 1, 1),
+                                                    pd.Timestamp(year, 12, 31, 23, 59, 59))
+                table = pa.table({'datetime': pa.array(datetimes), 'price_eur_per_mwh': pa.array(prices)})
+                
+                # Write under a temporary name so readers never see a partial shard
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = path.with_name(path.name + '.tmp')
+                pq.write_table(table, temp_path, compression='zstd')
+                os.replace(temp_path, path)
+                written.append(year)
+        
+        if written:
+            logger.info(f"Compacted {area_code} years {written} to Parquet")
+        return written
 
 
 class PriceFetcher:
@@ -139,6 +390,8 @@ class PriceFetcher:
         
         if self.has_api_access:
             try:
+                # Imported only when needed; entsoe pulls in requests and lxml
+                from entsoe import EntsoePandasClient
                 self.client = EntsoePandasClient(api_key=api_key)
                 logger.info("ENTSO-E API client initialized successfully")
             except Exception as e:
@@ -151,20 +404,27 @@ class PriceFetcher:
         
         self.db = PriceDatabase(db_path)
     
-    def get_price_data(self, area_code: str, start_date: pd.Timestamp, end_date: pd.Timestamp) -> pd.DataFrame:
-        """
-        Get electricity price data, using database cache and downloading missing data.
+    def _download_period(self, area_code: str, period_start: pd.Timestamp, period_end: pd.Timestamp) -> pd.Series:
+        """Download day-ahead prices for one missing period as a timezone-naive Series."""
+        logger.info(f"Downloading missing data from {period_start.date()} to {period_end.date()}")
         
-        Args:
-            area_code (str): Electricity area code (e.g., 'SE_4')
-            start_date (pd.Timestamp): Start date
-            end_date (pd.Timestamp): End date
-            
-        Returns:
-            pd.DataFrame: Price data with datetime index
-        """
-        logger.info(f"Getting price data for {area_code} from {start_date.date()} to {end_date.date()}")
+        # Convert to timezone-aware for API call
+        api_start = pd.Timestamp(period_start, tz='Europe/Stockholm')
+        api_end = pd.Timestamp(period_end, tz='Europe/Stockholm')
+        
+        new_data = self.client.query_day_ahead_prices(area_code, start=api_start, end=api_end)
         
+        # Convert to timezone-naive for storage
+        if hasattr(new_data.index, 'tz') and new_data.index.tz is not None:
+            new_data.index = new_data.index.tz_convert('Europe/Stockholm').tz_localize(None)
+        
+        # Convert Series to proper format if needed
+        if isinstance(new_data, pd.Series):
+            return new_data
+        return new_data.iloc[:, 0]
+    
+    def _fill_missing_data(self, area_code: str, start_date: pd.Timestamp, end_date: pd.Timestamp):
+        """Download and store any prices missing from the database for the period."""
         # Check what data we already have
         min_date, max_date, count = self.db.get_data_range(area_code)
         if min_date is not None:
@@ -177,36 +437,47 @@ class PriceFetcher:
         
         # Download missing data if we have API access
         if missing_periods and self.has_api_access:
-            for period_start, period_end in missing_periods:
-                if period_start <= period_end:  # Valid period
-                    logger.info(f"Downloading missing data from {period_start.date()} to {period_end.date()}")
+            periods = [(start, end) for start, end in missing_periods if start <= end]  # Valid periods
+            downloaded = []
+            # The requests are I/O bound, so fetch periods concurrently; capped to stay within ENTSO-E rate limits
+            with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, max(len(periods), 1))) as executor:
+                futures = {executor.submit(self._download_period, area_code, period_start, period_end): (period_start, period_end)
+                            for period_start, period_end in periods}
+                for future in as_completed(futures):
+                    period_start, period_end = futures[future]
                     try:
-                        # Convert to timezone-aware for API call
-                        api_start = pd.Timestamp(period_start, tz='Europe/Stockholm')
-                        api_end = pd.Timestamp(period_end, tz='Europe/Stockholm')
-                        
-                        new_data = self.client.query_day_ahead_prices(area_code, start=api_start, end=api_end)
-                        
-                        # Convert to timezone-naive for storage
-                        if hasattr(new_data.index, 'tz') and new_data.index.tz is not None:
-                            new_data.index = new_data.index.tz_convert('Europe/Stockholm').tz_localize(None)
-                        
-                        # Convert Series to proper format if needed
-                        if isinstance(new_data, pd.Series):
-                            price_series = new_data
-                        else:
-                            price_series = new_data.iloc[:, 0]
-                        
-                        # Store in database
-                        self.db.store_data(area_code, price_series)
-                        
+                        downloaded.append(future.result())
                     except Exception as e:
                         logger.error(f"Failed to download price data for period {period_start.date()} to {period_end.date()}: {e}")
                         # Don't raise - continue with whatever data we have
-                        
+            
+            # Store everything in a single transaction
+            if downloaded:
+                self.db.store_data(area_code, pd.concat(downloaded))
+        
         elif missing_periods and not self.has_api_access:
             logger.warning(f"Missing data for {len(missing_periods)} periods, but no API key available to fetch it")
             logger.info("To enable automatic data fetching, set ENTSOE_API_KEY environment variable")
+    
+    def get_price_data(self, area_code: str, start_date: pd.Timestamp, end_date: pd.Timestamp) -> pd.DataFrame:
+        """
+        Get electricity price data, using database cache and downloading missing data.
+        
+        Args:
+            area_code (str): Electricity area code (e.g., 'SE_4')
+            start_date (pd.Timestamp): Start date
+            end_date (pd.Timestamp): End date
+            
+        Returns:
+            pd.DataFrame: Price data with datetime index
+        """
+        logger.info(f"Getting price data for {area_code} from {start_date.date()} to {end_date.date()}")
+        
+        # Fast path: the range was already checked for gaps in this process
+        if self.db.is_range_complete(area_code, start_date, end_date):
+            logger.info(f"Requested period for {area_code} is fully cached")
+        else:
+            self._fill_missing_data(area_code, start_date, end_date)
         
         # Now query the requested data from database
         prices_df = self.db.query_data(area_code, start_date, end_date)
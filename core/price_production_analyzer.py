@@ -11,6 +11,7 @@ Usage:
 """
 
 import argparse
+import itertools
 import pandas as pd
 import os
 import sqlite3
@@ -28,6 +29,8 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_ONE_HOUR = pd.Timedelta(hours=1)
+
 class PriceDatabase:
     def __init__(self, db_path='price_data.db'):
         """Initialize the price database."""
@@ -45,7 +48,6 @@ class PriceDatabase:
                     PRIMARY KEY (area_code, datetime)
                 )
             ''')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_area_datetime ON price_data(area_code, datetime)')
     
     def get_data_range(self, area_code):
         """Get the available date range for an area."""
@@ -87,11 +89,11 @@ class PriceDatabase:
         else:
             # Check if we need data before our earliest date
             if requested_start < min_date:
-                missing_periods.append((requested_start, min(min_date - pd.Timedelta(hours=1), requested_end)))
+                missing_periods.append((requested_start, min(min_date - _ONE_HOUR, requested_end)))
             
             # Check if we need data after our latest date
             if requested_end > max_date:
-                missing_periods.append((max(max_date + pd.Timedelta(hours=1), requested_start), requested_end))
+                missing_periods.append((max(max_date + _ONE_HOUR, requested_start), requested_end))
         
         return missing_periods
     
@@ -99,19 +101,26 @@ class PriceDatabase:
         """Store price data in the database."""
         logger.info(f"Storing {len(price_data)} price records for {area_code}")
         
-        # Prepare data for insertion
-        records = []
-        for timestamp, price in price_data.items():
-            # Ensure timezone-naive timestamp
-            if hasattr(timestamp, 'tz') and timestamp.tz is not None:
-                timestamp = timestamp.tz_localize(None)
-            records.append((area_code, timestamp.isoformat(), float(price)))
+        # Prepare data for insertion column-wise, with timezone-naive timestamps; executemany
+        # consumes the rows lazily, so only one row tuple exists at a time
+        index = price_data.index
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        records = zip(itertools.repeat(area_code), index.strftime('%Y-%m-%dT%H:%M:%S'), price_data.to_numpy(dtype='float64').tolist())
         
         with sqlite3.connect(self.db_path) as conn:
             conn.executemany(
                 'INSERT OR REPLACE INTO price_data (area_code, datetime, price_eur_per_mwh) VALUES (?, ?, ?)',
                 records
             )
+        
+        # Parquet shards compacted by db_manager --compact would otherwise keep serving
+        # the replaced prices for the written years
+        from core.price_fetcher import parquet_cache_dir
+        area_dir = parquet_cache_dir(self.db_path) / area_code
+        if area_dir.exists():
+            for year in index.year.unique():
+                (area_dir / f"{year}.parquet").unlink(missing_ok=True)
     
     def query_data(self, area_code, start_date, end_date):
         """Query price data for a specific period."""
@@ -125,13 +134,12 @@ class PriceDatabase:
                 WHERE area_code = ? AND datetime >= ? AND datetime <= ?
                 ORDER BY datetime
             '''
-            df = pd.read_sql_query(query, conn, params=(area_code, start_str, end_str))
+            df = pd.read_sql_query(query, conn, params=(area_code, start_str, end_str),
+                                   index_col='datetime', parse_dates=['datetime'])
             
         if len(df) == 0:
             return pd.DataFrame(columns=['price_eur_per_mwh'])
         
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df = df.set_index('datetime')
         return df
 
 class PriceProductionAnalyzer:
@@ -413,15 +421,20 @@ class PriceProductionAnalyzer:
         # Load production data first to determine date range if not provided
         production_df = self.load_production_data(production_file)
         
+        # Sort once so the date limits below can slice by binary search
+        if not production_df.index.is_monotonic_increasing:
+            production_df = production_df.sort_index()
+        
         # Set date range - use full production timeframe by default
         production_start = pd.Timestamp(production_df.index.min(), tz='Europe/Stockholm')
         production_end = pd.Timestamp(production_df.index.max(), tz='Europe/Stockholm')
         
         # Only limit timeframe if explicitly provided
+        lo = hi = None
         if start_date is not None:
             start_date = pd.Timestamp(start_date, tz='Europe/Stockholm')
             if start_date > production_start:
-                production_df = production_df[production_df.index >= start_date.tz_localize(None)]
+                lo = start_date.tz_localize(None)
                 logger.info(f"Limiting production data to start from: {start_date.date()}")
         else:
             start_date = production_start
@@ -429,11 +442,14 @@ class PriceProductionAnalyzer:
         if end_date is not None:
             end_date = pd.Timestamp(end_date, tz='Europe/Stockholm')
             if end_date < production_end:
-                production_df = production_df[production_df.index <= end_date.tz_localize(None)]
+                hi = end_date.tz_localize(None)
                 logger.info(f"Limiting production data to end at: {end_date.date()}")
         else:
             end_date = production_end
         
+        if lo is not None or hi is not None:
+            production_df = production_df.loc[lo:hi]
+        
         logger.info(f"Analysis period: {start_date.date()} to {end_date.date()}")
         
         # Get price data for the determined timeframe
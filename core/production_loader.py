@@ -7,7 +7,7 @@ Handles loading and processing solar production data from CSV files.
 
 import pandas as pd
 import logging
-from typing import Tuple
+from typing import Tuple, Union, IO
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,31 +18,53 @@ class ProductionLoader:
     """Handles loading solar production data from CSV files."""
     
     @staticmethod
-    def load_production_data(production_file: str) -> pd.DataFrame:
+    def _rewind(production_file: Union[str, IO]):
+        """Seek an in-memory buffer back to the start before re-reading it."""
+        if hasattr(production_file, 'seek'):
+            production_file.seek(0)
+    
+    @staticmethod
+    def _read_full_csv(production_file: Union[str, IO], **kwargs) -> pd.DataFrame:
+        """Read a whole CSV with the multi-threaded pyarrow parser, falling back to pandas' own."""
+        try:
+            return pd.read_csv(production_file, engine='pyarrow', **kwargs)
+        except Exception as e:
+            # pyarrow is stricter about ragged rows and quoting than the C parser
+            logger.debug(f"pyarrow CSV parse failed, retrying with the C parser: {e}")
+            ProductionLoader._rewind(production_file)
+            return pd.read_csv(production_file, **kwargs)
+    
+    @staticmethod
+    def load_production_data(production_file: Union[str, IO]) -> pd.DataFrame:
         """
         Load solar production data from CSV file with auto-detection of format.
         
         Args:
-            production_file (str): Path to production CSV file
+            production_file (str or file-like): Path to production CSV file, or a binary buffer with its contents
             
         Returns:
             pd.DataFrame: Production data with datetime index
         """
         logger.info(f"Loading production data from {production_file}")
+        rewind = ProductionLoader._rewind
+        read_full_csv = ProductionLoader._read_full_csv
         
         # Auto-detect separator and decimal
         try:
             # Try semicolon separator first (common in European CSV)
+            rewind(production_file)
             production_df = pd.read_csv(production_file, sep=';', decimal=',', nrows=5)
+            rewind(production_file)
             if len(production_df.columns) > 1:
                 # Semicolon worked, load full file
-                production_df = pd.read_csv(production_file, sep=';', decimal=',')
+                production_df = read_full_csv(production_file, sep=';', decimal=',')
             else:
                 # Try comma separator
-                production_df = pd.read_csv(production_file, sep=',', decimal='.')
+                production_df = read_full_csv(production_file, sep=',', decimal='.')
         except:
             # Fallback to comma separator
-            production_df = pd.read_csv(production_file, sep=',', decimal='.')
+            rewind(production_file)
+            production_df = read_full_csv(production_file, sep=',', decimal='.')
         
         # Find datetime and production columns
         datetime_cols = [col for col in production_df.columns if any(word in col.lower() for word in ['datum', 'date', 'time', 'tid'])]
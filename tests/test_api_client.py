@@ -69,7 +69,8 @@ def test_analyze_production(csv_file, area='SE_4', currency='SEK'):
         print("Analysis Results:")
         print(f"  Period: {result['analysis']['period']['days']} days")
         print(f"  Currency: {result['analysis']['prices']['currency']}")
-        print(f"  Price range: {result['analysis']['prices']['min']['display']} to {result['analysis']['prices']['max']['display']}")
+        prices = result['analysis']['prices']
+        print(f"  Price range: {prices['min']['value']:.4f} to {prices['max']['value']:.4f} {prices['min']['unit']}")
         print(f"  Total production: {result['analysis']['production']['total_kwh']} kWh")
         print(f"  Negative price hours: {result['analysis']['negative_prices']['hours_count']}")
         if result['analysis']['negative_prices']['total_cost']:
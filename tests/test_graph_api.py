@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the internal graph API, run against a temporary price database
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.price_fetcher import PriceDatabase
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    """A test client for the app, with data/price_data.db built in a temporary working directory."""
+    workdir = tmp_path_factory.mktemp('app')
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        (workdir / 'data' / 'cache').mkdir(parents=True)
+        index = pd.date_range('2024-06-01', '2024-08-31 23:00', freq='h')
+        rng = np.random.default_rng(0)
+        database = PriceDatabase('data/price_data.db')
+        # A large offset with a small spread, where a one-pass sum of squares cancels badly
+        database.store_data('SE_4', pd.Series(1e7 + rng.normal(0, 0.5, len(index)), index=index))
+        # Three-decimal prices, many of them ties where np.round and round() disagree
+        database.store_data('SE_3', pd.Series(np.round(rng.normal(30, 40, len(index)), 3), index=index))
+        database.close()
+
+        import app as app_module
+        app_module.app.config['TESTING'] = True
+        test_client = app_module.app.test_client()
+        test_client.get('/')
+        token = test_client.get('/api-token').get_json()['token']
+        test_client.environ_base[f"HTTP_{app_module.INTERNAL_API_HEADER.upper().replace('-', '_')}"] = token
+        yield test_client
+    finally:
+        os.chdir(previous_cwd)
+
+
+def stored_prices(area):
+    """All prices stored for an area by the client fixture, in EUR/MWh."""
+    database = PriceDatabase('data/price_data.db')
+    try:
+        prices = database.query_data(area, pd.Timestamp('2024-06-01'), pd.Timestamp('2024-08-31 23:00'))
+    finally:
+        database.close()
+    return prices['price_eur_per_mwh'].to_numpy()
+
+
+@pytest.mark.parametrize('area', ['SE_4', 'SE_3'])
+def test_price_distribution_std_matches_numpy(client, area):
+    """The reported standard deviation is the sample standard deviation of the stored prices."""
+    response = client.get(f'/_api/graph/price-distribution?area={area}')
+    assert response.status_code == 200
+
+    prices = stored_prices(area)
+    statistics = response.get_json()['statistics']
+    assert statistics['std_price'] == round(float(np.std(prices, ddof=1)), 2)
+    assert statistics['mean_price'] == round(float(np.mean(prices)), 2)
+
+
+def test_price_timeline_rounds_like_builtin_round(client):
+    """Hourly timeline prices are rounded with round(), not NumPy's scaled rounding."""
+    response = client.get('/_api/graph/price-timeline?area=SE_3')
+    assert response.status_code == 200
+
+    prices = stored_prices('SE_3')
+    timeline = response.get_json()['timeline']
+    assert [point['price'] for point in timeline] == [round(price, 2) for price in prices.tolist()]
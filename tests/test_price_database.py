@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite price cache in core.price_fetcher
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.price_fetcher import PriceDatabase, PriceFetcher
+
+
+def hourly_prices(start, end, tz=None):
+    """Hourly prices between start and end inclusive, optionally timezone-aware like ENTSO-E data."""
+    index = pd.date_range(start, end, freq='h', tz=tz)
+    return pd.Series(np.arange(len(index), dtype=np.float64), index=index)
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = PriceDatabase(str(tmp_path / 'prices.db'))
+    yield database
+    database.close()
+
+
+def create_rowid_table(path, rows):
+    """A price_data table in the rowid layout of earlier versions."""
+    with sqlite3.connect(path) as conn:
+        conn.execute('''
+            CREATE TABLE price_data (
+                area_code TEXT NOT NULL,
+                datetime TEXT NOT NULL,
+                price_eur_per_mwh REAL,
+                PRIMARY KEY (area_code, datetime)
+            )
+        ''')
+        conn.execute('CREATE INDEX idx_area_datetime ON price_data(area_code, datetime)')
+        conn.executemany('INSERT INTO price_data VALUES (?, ?, ?)', rows)
+    conn.close()
+
+
+def table_sql(path):
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE tbl_name LIKE 'price_data%'"))
+
+
+def test_rowid_table_is_rebuilt_without_rowid(tmp_path):
+    """An existing rowid table is migrated with its rows, and the redundant index dropped."""
+    path = str(tmp_path / 'prices.db')
+    create_rowid_table(path, [('SE_4', '2024-06-01T00:00:00', 1.5), ('SE_4', '2024-06-01T01:00:00', 2.5)])
+
+    database = PriceDatabase(path)
+    result = database.query_data('SE_4', pd.Timestamp('2024-06-01'), pd.Timestamp('2024-06-01 23:00'))
+    database.close()
+
+    assert result['price_eur_per_mwh'].tolist() == [1.5, 2.5]
+    schema = table_sql(path)
+    assert set(schema) == {'price_data'}
+    assert 'WITHOUT ROWID' in schema['price_data'].upper()
+
+
+def test_failed_rebuild_leaves_original_table(tmp_path):
+    """The rebuild runs in one transaction, so a failing copy leaves no half-migrated table."""
+    path = str(tmp_path / 'prices.db')
+    # NULL prices violate the rebuilt table's NOT NULL constraint
+    create_rowid_table(path, [('SE_4', '2024-06-01T00:00:00', None)])
+
+    with pytest.raises(sqlite3.IntegrityError):
+        PriceDatabase(path)
+
+    schema = table_sql(path)
+    assert 'price_data_new' not in schema
+    assert 'WITHOUT ROWID' not in schema['price_data'].upper()
+
+
+def test_legacy_analyzer_does_not_recreate_dropped_index(db):
+    """The clustered primary key replaces idx_area_datetime for both database classes."""
+    from core.price_production_analyzer import PriceDatabase as LegacyPriceDatabase
+
+    LegacyPriceDatabase(db.db_path)
+
+    assert 'idx_area_datetime' not in table_sql(db.db_path)
+
+
+def test_missing_periods_reports_interior_gap(db):
+    """Hours missing inside the stored range are reported, not just the edges."""
+    prices = hourly_prices('2024-06-01 00:00', '2024-06-05 23:00')
+    gap = (prices.index >= '2024-06-03 10:00') & (prices.index <= '2024-06-03 12:00')
+    db.store_data('SE_4', prices[~gap])
+
+    missing = db.get_missing_periods('SE_4', pd.Timestamp('2024-06-01'), pd.Timestamp('2024-06-05 23:00'))
+
+    assert missing == [(pd.Timestamp('2024-06-03 10:00'), pd.Timestamp('2024-06-03 12:00'))]
+
+
+def test_missing_periods_spring_forward_day(db):
+    """The hour skipped when clocks go forward is never expected."""
+    db.store_data('SE_4', hourly_prices('2024-03-31 00:00', '2024-03-31 23:00', tz='Europe/Stockholm'))
+
+    assert db.get_missing_periods('SE_4', pd.Timestamp('2024-03-31'), pd.Timestamp('2024-03-31 23:00')) == []
+
+
+def test_missing_periods_spring_forward_day_with_gap(db):
+    """A real gap next to the skipped hour is still found."""
+    prices = hourly_prices('2024-03-31 00:00', '2024-03-31 23:00', tz='Europe/Stockholm')
+    db.store_data('SE_4', prices.drop(pd.Timestamp('2024-03-31 03:00', tz='Europe/Stockholm')))
+
+    missing = db.get_missing_periods('SE_4', pd.Timestamp('2024-03-31'), pd.Timestamp('2024-03-31 23:00'))
+
+    assert missing == [(pd.Timestamp('2024-03-31 03:00'), pd.Timestamp('2024-03-31 03:00'))]
+
+
+def test_missing_periods_fall_back_day(db):
+    """The repeated hour when clocks go back is stored once and counts as present."""
+    prices = hourly_prices('2024-10-27 00:00', '2024-10-27 23:00', tz='Europe/Stockholm')
+    assert len(prices) == 25
+    db.store_data('SE_4', prices)
+
+    assert db.get_missing_periods('SE_4', pd.Timestamp('2024-10-27'), pd.Timestamp('2024-10-27 23:00')) == []
+
+
+def test_missing_periods_reversed_range(db):
+    """A start after the end has nothing to download."""
+    db.store_data('SE_4', hourly_prices('2024-06-01 00:00', '2024-06-02 23:00'))
+
+    assert db.get_missing_periods('SE_4', pd.Timestamp('2025-01-01'), pd.Timestamp('2024-06-01')) == []
+    assert db.get_missing_periods('SE_4', pd.Timestamp('2024-06-02'), pd.Timestamp('2024-06-01')) == []
+
+
+def test_get_price_data_reversed_range_raises_value_error(tmp_path):
+    """A reversed range is reported as having no price data."""
+    fetcher = PriceFetcher(api_key='', db_path=str(tmp_path / 'prices.db'))
+    fetcher.db.store_data('SE_4', hourly_prices('2024-06-01 00:00', '2024-06-02 23:00'))
+
+    with pytest.raises(ValueError, match='No price data available'):
+        fetcher.get_price_data('SE_4', pd.Timestamp('2025-01-01', tz='Europe/Stockholm'),
+                               pd.Timestamp('2024-06-01', tz='Europe/Stockholm'))
+
+
+def test_flush_to_parquet_compacts_finished_years(db):
+    """Finished years are written to shards and read back unchanged."""
+    prices = hourly_prices('2024-12-30 00:00', '2025-01-02 23:00')
+    db.store_data('SE_4', prices)
+    before = db.query_data('SE_4', pd.Timestamp('2024-12-30'), pd.Timestamp('2025-01-02 23:00'))
+
+    assert db.flush_to_parquet('SE_4') == [2024, 2025]
+    assert (db.parquet_dir / 'SE_4' / '2024.parquet').exists()
+    assert db.flush_to_parquet('SE_4') == []
+
+    after = db.query_data('SE_4', pd.Timestamp('2024-12-30'), pd.Timestamp('2025-01-02 23:00'))
+    pd.testing.assert_frame_equal(after, before)
+
+
+def test_query_across_year_boundary_mixes_shard_and_sqlite(db):
+    """A range spanning a compacted and an uncompacted year is read in order from both."""
+    prices = hourly_prices('2024-12-31 00:00', '2025-01-01 23:00')
+    db.store_data('SE_4', prices)
+    db.flush_to_parquet('SE_4')
+    (db.parquet_dir / 'SE_4' / '2025.parquet').unlink()
+
+    result = db.query_data('SE_4', pd.Timestamp('2024-12-31 20:00'), pd.Timestamp('2025-01-01 03:00'))
+
+    expected = prices.loc['2024-12-31 20:00':'2025-01-01 03:00']
+    assert list(result.index) == list(expected.index)
+    np.testing.assert_array_equal(result['price_eur_per_mwh'].to_numpy(), expected.to_numpy())
+
+
+def test_store_data_drops_stale_shard(db):
+    """Overwriting prices in a compacted year is visible to later reads."""
+    db.store_data('SE_4', hourly_prices('2024-06-01 00:00', '2024-06-01 23:00'))
+    db.flush_to_parquet('SE_4')
+
+    db.store_data('SE_4', hourly_prices('2024-06-01 00:00', '2024-06-01 23:00') + 100, overwrite=True)
+
+    assert not (db.parquet_dir / 'SE_4' / '2024.parquet').exists()
+    result = db.query_data('SE_4', pd.Timestamp('2024-06-01'), pd.Timestamp('2024-06-01 23:00'))
+    assert result['price_eur_per_mwh'].iloc[0] == 100
+
+
+def test_legacy_analyzer_store_drops_stale_shard(db):
+    """Writes through the legacy analyzer's database also invalidate compacted years."""
+    from core.price_production_analyzer import PriceDatabase as LegacyPriceDatabase
+
+    db.store_data('SE_4', hourly_prices('2024-06-01 00:00', '2024-06-01 23:00'))
+    db.store_data('SE_4', hourly_prices('2023-06-01 00:00', '2023-06-01 23:00'))
+    db.flush_to_parquet('SE_4')
+
+    LegacyPriceDatabase(db.db_path).store_data('SE_4', hourly_prices('2024-06-01 00:00', '2024-06-01 23:00') + 100)
+
+    assert not (db.parquet_dir / 'SE_4' / '2024.parquet').exists()
+    assert (db.parquet_dir / 'SE_4' / '2023.parquet').exists()
+    result = db.query_data('SE_4', pd.Timestamp('2024-06-01'), pd.Timestamp('2024-06-01 23:00'))
+    assert result['price_eur_per_mwh'].iloc[0] == 100
@@ -28,8 +28,17 @@ class CSVFormatDetectorFallback:
     def __init__(self, sample_rows: int = 10):
         self.sample_rows = sample_rows
     
-    def _read_sample(self, file_path: str) -> str:
-        """Read the first N lines from the CSV file."""
+    def _read_sample(self, file_path) -> str:
+        """Read the first N lines from the CSV file (path or binary buffer)."""
+        if hasattr(file_path, 'read'):
+            file_path.seek(0)
+            raw = b''.join(file_path.readline() for _ in range(self.sample_rows))
+            file_path.seek(0)
+            try:
+                return raw.decode('utf-8')
+            except UnicodeDecodeError:
+                return raw.decode('latin1')
+        
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 lines = []
@@ -152,12 +161,12 @@ class CSVFormatDetectorFallback:
         # No header or detection failed, use indices
         return "0", "1"
     
-    def detect_format(self, file_path: str) -> Dict:
+    def detect_format(self, file_path) -> Dict:
         """
         Detect CSV format and return pandas.read_csv parameters.
         
         Args:
-            file_path: Path to CSV file
+            file_path: Path to CSV file or a binary buffer with its contents
             
         Returns:
             Dict: Parameters for pd.read_csv
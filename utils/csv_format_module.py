@@ -53,16 +53,28 @@ class CSVFormatDetector:
         self.sample_rows = sample_rows
         self.endpoint = 'https://api.x.ai/v1/chat/completions'
         
-    def _read_sample(self, file_path: str) -> str:
+    def _read_sample(self, file_path) -> str:
         """
         Read the first N lines from the CSV file.
         
         Args:
-            file_path: Path to CSV file
+            file_path: Path to CSV file or a binary buffer with its contents
             
         Returns:
             str: Sample text content
         """
+        if hasattr(file_path, 'read'):
+            file_path.seek(0)
+            raw = b''.join(file_path.readline() for _ in range(self.sample_rows))
+            file_path.seek(0)
+            try:
+                sample = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                logger.info("UTF-8 failed, trying latin1 encoding")
+                sample = raw.decode('latin1')
+            logger.info(f"Sample text from buffer: {sample[:200]}...")
+            return sample
+        
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 lines = []
@@ -199,12 +211,12 @@ CSV snippet:
             logger.error(f"Unexpected error in LLM call: {e}")
             raise
     
-    def detect_format(self, file_path: str) -> Dict:
+    def detect_format(self, file_path) -> Dict:
         """
         Detect CSV format and return pandas.read_csv parameters.
         
         Args:
-            file_path: Path to CSV file
+            file_path: Path to CSV file or a binary buffer with its contents
             
         Returns:
             Dict: Parameters for pd.read_csv